@@ -92,6 +92,19 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 
+# Per-process memory cache (category nav, see news_feed/categories.py). Use a
+# shared backend such as Redis or the database cache when the ingest runs in
+# its own process, so its invalidations reach the web workers at once.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'authentic-news',
+    }
+}
+
+# Anonymous feed pages are served from CACHES until the next article write
+# (news_feed/pagecache.py).
+FEED_PAGE_CACHE = True
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -150,10 +163,27 @@ LOGOUT_REDIRECT_URL = '/'
 # Add to the bottom of the file or in a new settings block
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# weatherapi.com, used through news_feed/weather.py (cached, see there)
+WEATHER_API_URL = os.environ.get('WEATHER_API_URL', 'https://api.weatherapi.com/v1')
+WEATHER_API_KEY = os.environ.get('WEATHER_API_KEY', '4723e60bee924b14862145249250509')
+WEATHER_TIMEOUT = 3  # seconds; a cold miss never holds a page longer than this
+
+# Search: "database" uses the full-text index of the database (FTS5 on
+# SQLite, tsvector on PostgreSQL); "inverted_index" searches in-process from
+# SEARCH_INDEX_FILE, which all workers memory-map and the ingest keeps up to
+# date (not on Windows: it needs fcntl locks, check news_feed.W001 says so
+# and the database index is used). Build it at deploy, before the web workers start:
+#     python manage.py build_search_index --if-missing
+SEARCH_BACKEND = 'database'
+SEARCH_INDEX_FILE = BASE_DIR / 'search_index.bin'
+
+# The ingest normally runs as one long-lived worker:
+#     python manage.py run_ingest_daemon
+# It rewrites this file after every run; `run_ingest_daemon --check` reads it.
+INGEST_HEALTH_FILE = BASE_DIR / 'ingest_health.json'
+
+# Fallback for hosts without the daemon. Feeds that are not due are skipped,
+# so an hourly tick is enough.
 CRONJOBS = [
-    # Run every 2 hours during the day (6 AM to 10 PM)
-    ('0 6,8,10,12,14,16,18,20,22 * * *', 'news_feed.management.commands.fetch_and_verify_news.Command', {}, 'fetch_news_every_2_hours'),
-    
-    # Or run every hour from 6 AM to 10 PM
-    ('0 6-22 * * *', 'news_feed.management.commands.fetch_and_verify_news.Command', {}, 'fetch_news_hourly'),
-]
\ No newline at end of file
+    ('0 6-22 * * *', 'django.core.management.call_command', ['fetch_and_verify_news']),
+]
@@ -1,7 +1,12 @@
 # Register your models here.
 from django.contrib import admin
-from .models import Article, UserSubscription, Feedback
+from .models import Article, UserSubscription, Feedback, Feed, IngestLock, IngestRun, ScrapedImage, StoryCluster
 
 admin.site.register(Article)
 admin.site.register(UserSubscription)
 admin.site.register(Feedback)
+admin.site.register(Feed)
+admin.site.register(ScrapedImage)
+admin.site.register(StoryCluster)
+admin.site.register(IngestLock)
+admin.site.register(IngestRun)
@@ -8,4 +8,5 @@ class NewsFeedConfig(AppConfig):
     def ready(self):
         # Import your signals here to ensure they are registered
         import news_feed.signals
+        import news_feed.search  # registers the search backend system check
 
@@ -0,0 +1,191 @@
+# news_feed/bench/__init__.py
+"""
+Offline ingest benchmark.
+
+ReplaySession stands in for the ingest command's requests SESSION and
+answers from recorded payloads under fixtures/: feeds by URL (see
+manifest.json), every other URL with one of the recorded article pages.
+At scale N each recorded feed is served N times under distinct hosts,
+with remixed headlines and per-copy links so the copies are new stories
+rather than duplicates. Dates are moved to "just now" when served, so the
+fixtures never age out of the ingest window.
+
+run_benchmark() runs the full fetch_and_verify_news pipeline against the
+current database; the benchmark_ingest command wraps it in a throwaway
+test database.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+import tracemalloc
+import zlib
+from datetime import timedelta
+from email.utils import format_datetime
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from django.core.management import call_command
+from django.test.utils import override_settings
+from django.utils import timezone
+from requests.structures import CaseInsensitiveDict
+
+from news_feed.management.commands import fetch_and_verify_news as ingest
+from news_feed.models import Article, Feed, IngestLock, IngestRun, ScrapedImage, StoryCluster
+
+try:
+    import resource   # not on Windows
+except ImportError:
+    resource = None
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+_DATE = re.compile(rb"<(pubDate|published|updated)>[^<]*</\1>")
+_TITLE = re.compile(rb"(<(?:item|entry)>\s*<title>)([^<]*)(</title>)")
+_LINK = re.compile(rb'(<link>|<link href=")([^<"]+)')
+
+
+def _copy_url(url: str, copy: int) -> str:
+    """Copy 0 is the recorded URL; copy k moves to host c<k>.<domain>, which SOURCES still matches."""
+    if not copy:
+        return url
+    parts = urlsplit(url)
+    host = parts.netloc.removeprefix("www.")
+    return urlunsplit(parts._replace(netloc=f"c{copy}.{host}"))
+
+
+def _tag_link(url: str, copy: int) -> str:
+    if not copy:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}copy={copy}"
+
+
+def _response(url, content=b"", status_code=200, headers=None):
+    r = requests.Response()
+    r.url = url
+    r.status_code = status_code
+    r.headers = CaseInsensitiveDict(headers or {})
+    r.encoding = "utf-8"
+    r._content = content
+    r._content_consumed = True   # iter_content() then slices _content
+    return r
+
+
+class ReplaySession:
+    """requests.Session look-alike serving recorded fixtures, optionally with a fixed latency."""
+
+    def __init__(self, scale: int = 1, latency: float = 0.0, fixtures_dir=FIXTURES_DIR):
+        fixtures_dir = Path(fixtures_dir)
+        manifest = json.loads((fixtures_dir / "manifest.json").read_text(encoding="utf-8"))
+        self.latency = latency
+        self.recorded = {f["url"]: (fixtures_dir / f["file"]).read_bytes() for f in manifest["feeds"]}
+        self.pages = [(fixtures_dir / p).read_bytes() for p in manifest["pages"]]
+        # url -> (recorded url, copy, category) for every feed at this scale
+        self.feeds = {
+            _copy_url(f["url"], copy): (f["url"], copy, f.get("category", "News Showcase"))
+            for copy in range(max(1, scale)) for f in manifest["feeds"]
+        }
+        words = set()
+        for payload in self.recorded.values():
+            for _, title, _ in _TITLE.findall(payload):
+                words.update(w for w in title.decode().split() if len(w) > 3)
+        self.vocabulary = sorted(words)
+        self.requests = {"feed": 0, "page": 0, "not_modified": 0}
+        self.bytes_served = 0
+
+    def feed_payload(self, url: str) -> bytes:
+        recorded_url, copy, _ = self.feeds[url]
+        payload = self.recorded[recorded_url]
+        if copy:
+            titles = iter(range(1_000_000))
+
+            def remix(m):
+                rng = random.Random(f"{url}:{next(titles)}")
+                return m.group(1) + " ".join(rng.sample(self.vocabulary, 7)).encode() + m.group(3)
+
+            payload = _TITLE.sub(remix, payload)
+            payload = _LINK.sub(lambda m: m.group(1) + _tag_link(m.group(2).decode(), copy).encode(), payload)
+        now = timezone.now()
+        minutes = iter(range(1_000_000))
+
+        def fresh_date(m):
+            when = now - timedelta(minutes=next(minutes))
+            value = format_datetime(when) if m.group(1) == b"pubDate" else when.isoformat()
+            return b"<%s>%s</%s>" % (m.group(1), value.encode(), m.group(1))
+
+        return _DATE.sub(fresh_date, payload)
+
+    def get(self, url, timeout=None, headers=None, stream=False, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        if url not in self.feeds:
+            self.requests["page"] += 1
+            page = self.pages[zlib.crc32(url.encode()) % len(self.pages)]
+            self.bytes_served += len(page)
+            return _response(url, page, headers={"Content-Type": "text/html; charset=utf-8"})
+
+        body = self.feed_payload(url)
+        etag = '"%s"' % hashlib.sha1(_DATE.sub(b"", body)).hexdigest()
+        if (headers or {}).get("If-None-Match") == etag:
+            self.requests["not_modified"] += 1
+            return _response(url, status_code=304)
+        self.requests["feed"] += 1
+        self.bytes_served += len(body)
+        return _response(url, body, headers={"Content-Type": "application/rss+xml", "ETag": etag})
+
+
+def reset_database():
+    """Empty every table the ingest reads or writes."""
+    for model in (Article, StoryCluster, ScrapedImage, Feed, IngestRun, IngestLock):
+        model.objects.all().delete()
+
+
+def run_benchmark(scale: int = 1, latency: float = 0.0, trace_memory: bool = False,
+                  fixtures_dir=FIXTURES_DIR) -> dict:
+    """
+    One fetch_and_verify_news run over `scale` copies of the fixture feeds,
+    on a freshly emptied database. Returns throughput, stage times and,
+    with trace_memory, the peak Python heap of the run.
+    """
+    reset_database()
+    session = ReplaySession(scale, latency, fixtures_dir)
+    Feed.objects.bulk_create([
+        Feed(url=url, category=category) for url, (_, _, category) in session.feeds.items()
+    ])
+
+    logging.disable(logging.WARNING)   # one image-scrape-miss line per page otherwise
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        # DEBUG would keep every SQL statement in connection.queries
+        with mock.patch.object(ingest, "SESSION", session), override_settings(DEBUG=False):
+            call_command("fetch_and_verify_news", all=True, stdout=StringIO())
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        logging.disable(logging.NOTSET)
+
+    report = IngestRun.objects.first().report
+    counts, stages = report["counts"], report["stages"]
+    return {
+        "scale": scale,
+        "feeds": counts.get("feeds", 0),
+        "entries": counts.get("parsed", 0),
+        "articles_saved": counts.get("saved", 0),
+        "requests": dict(session.requests),
+        "bytes_served": session.bytes_served,
+        "seconds": round(seconds, 3),
+        "entries_per_s": round(counts.get("parsed", 0) / seconds, 1) if seconds else None,
+        "db_write_s": round(sum(s for stage, s in stages.items() if stage.startswith("db_")), 3),
+        "peak_mb": round(peak / 2**20, 2) if peak is not None else None,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1) if resource else None,
+        "stages": stages,
+    }
@@ -0,0 +1,163 @@
+# news_feed/bench/views.py
+"""
+Request-path benchmark for news_feed.views.
+
+seed_articles() fills the Article table with N synthetic verified rows
+spread over categories, sources and the last ten days. run_view_benchmark()
+drives every read-only view through the Django test client and records
+latency percentiles, SQL query counts and response size per view;
+over_budget() lists the views that broke QUERY_BUDGETS.
+
+The weather API (behind the widget endpoint) is answered from
+fixtures/weather.json and the homepage's background-ingest trigger is
+switched off, so nothing leaves the machine.
+The Local category is left out on purpose: it calls third-party news APIs
+and feeds on every request.
+"""
+import random
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from news_feed import views, weather
+from news_feed.bench import FIXTURES_DIR, _response
+from news_feed.models import Article
+
+SEED_BATCH = 5000
+
+CATEGORIES = ["India", "World", "Business", "Technology", "Sports", "Science", "Health",
+              "Entertainment", "News Showcase"]
+SOURCES = [("The Hindu", "https://www.thehindu.com"), ("BBC News", "https://www.bbc.co.uk"),
+           ("Reuters", "https://www.reuters.com"), ("NDTV", "https://www.ndtv.com"),
+           ("WIRED", "https://www.wired.com"), ("ESPN", "https://www.espn.com"),
+           ("Example Daily", "https://daily.example.com")]
+WORDS = ("parliament budget election court monsoon cricket final market shares inflation startup "
+         "satellite launch vaccine hospital climate summit treaty ceasefire galaxy telescope chip "
+         "smartphone league transfer festival film rally metro airport railway river flood heatwave "
+         "minister policy reform export import tariff rupee energy solar wind battery").split()
+
+# (name, url name, url args, query string) of every view measured
+VIEW_CASES = [
+    ("homepage", "homepage", [], ""),
+    ("for_you", "categorized_news", ["for-you"], ""),
+    ("showcase", "categorized_news", ["news-showcase"], ""),
+    ("india", "categorized_news", ["india"], ""),
+    ("world", "categorized_news", ["world"], ""),
+    ("business", "categorized_news", ["business"], ""),
+    ("technology", "categorized_news", ["technology"], ""),
+    ("sports", "categorized_news", ["sports"], ""),
+    ("science", "categorized_news", ["science"], ""),
+    ("health", "categorized_news", ["health"], ""),
+    ("feed_page", "article_page", [], "?category=health"),
+    ("weather_widget", "weather_widget", [], "?lat=13.08&lon=80.27"),
+    ("search", "search_results", [], "?q=budget"),
+    ("search_empty", "search_results", [], ""),
+]
+
+# Most SQL statements a view may run, whatever the table size. Lower these
+# as views get cheaper; a view missing here has no budget.
+QUERY_BUDGETS = {
+    "homepage": 1,
+    "for_you": 1,
+    "showcase": 2,
+    "india": 2,
+    "world": 2,
+    "business": 2,
+    "technology": 1,
+    "sports": 1,
+    "science": 1,
+    "health": 1,
+    "feed_page": 1,
+    "weather_widget": 0,
+    "search": 1,
+    "search_empty": 1,
+}
+
+
+def seed_articles(n: int, seed: int = 0, batch_size: int = SEED_BATCH):
+    """Insert n verified articles with realistic spread; returns the number inserted."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    made = 0
+    while made < n:
+        batch = []
+        for i in range(made, min(n, made + batch_size)):
+            source_name, site = rng.choice(SOURCES)
+            published = now - timedelta(minutes=rng.randrange(10 * 24 * 60))
+            batch.append(Article(
+                title=" ".join(rng.sample(WORDS, 8)).capitalize() + f" ({i})",
+                summary=" ".join(rng.choices(WORDS, k=40)),
+                category=rng.choice(CATEGORIES),
+                source_url=f"{site}/news/{i}",
+                source_name=source_name,
+                publication_date=published,
+                verified_at=published,
+                is_verified=rng.random() < 0.95,
+                credibility_score=rng.randrange(30, 100),
+                image_url=f"{site}/img/{i}.jpg" if rng.random() < 0.7 else "",
+                story_key=f"{rng.randrange(n // 2 + 1):016x}",
+                verified_by_sources=", ".join(name for name, _ in rng.sample(SOURCES, 2)),
+            ))
+        Article.objects.bulk_create(batch)
+        made += len(batch)
+    return made
+
+
+def _percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def measure_view(client, path: str, repeat: int) -> dict:
+    """One warm-up request, then `repeat` timed ones; queries are counted on the last."""
+    client.get(path)
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "path": path,
+        "status": response.status_code,
+        "queries": len(queries),
+        "bytes": len(response.content),
+        "p50_ms": round(_percentile(timings, 0.5), 2),
+        "p95_ms": round(_percentile(timings, 0.95), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+def run_view_benchmark(repeat: int = 20, cases=VIEW_CASES, page_cache: bool = False) -> dict:
+    """
+    Measure every view in `cases` against the current database; returns
+    {name: result}. The feed page cache is off unless `page_cache`, so the
+    budgets keep measuring what a page costs to build.
+    """
+    payload = _response("weather", (FIXTURES_DIR / "weather.json").read_bytes(),
+                        headers={"Content-Type": "application/json"})
+    client = Client()
+    with mock.patch.object(weather.requests, "get", return_value=payload), \
+            mock.patch.object(views, "claim_trigger", return_value=False), \
+            override_settings(DEBUG=False, ALLOWED_HOSTS=["testserver"], FEED_PAGE_CACHE=page_cache):
+        return {name: measure_view(client, reverse(url_name, args=args) + query, repeat)
+                for name, url_name, args, query in cases}
+
+
+def over_budget(results, budgets=QUERY_BUDGETS, max_p95_ms=None):
+    """Human-readable problems: failed responses, query budgets, and the optional latency cap."""
+    problems = []
+    for name, r in results.items():
+        if r["status"] != 200:
+            problems.append(f"{name}: HTTP {r['status']}")
+        if name in budgets and r["queries"] > budgets[name]:
+            problems.append(f"{name}: {r['queries']} queries (budget {budgets[name]})")
+        if max_p95_ms is not None and r["p95_ms"] > max_p95_ms:
+            problems.append(f"{name}: p95 {r['p95_ms']} ms (budget {max_p95_ms} ms)")
+    return problems
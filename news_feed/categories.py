@@ -0,0 +1,63 @@
+# news_feed/categories.py
+"""
+The category navigation bar, cached.
+
+category_list() answers from Django's cache, so rendering the nav costs no
+query; it is rebuilt from one DISTINCT query on a miss. Whatever writes
+articles calls invalidate_on_commit() and the next request after the commit
+sees the new list. With the default per-process local-memory cache an ingest
+in another process (daemon, cron) cannot reach the web workers' copies, so
+the key also carries the feed generation (news_feed/pagecache.py): the
+ingest's bump retires the list together with the pages it is rendered
+into, and a page cached under a new generation never shows an older nav.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+from news_feed import pagecache
+from news_feed.models import Article
+
+CACHE_KEY = "news_feed:categories"
+CACHE_TTL = 10 * 60   # seconds; upper bound on staleness from writes that bump no generation
+
+# Pseudo-categories with their own tabs, and the catch-all that gets none
+EXCLUDED = {"For You", "News Showcase", "General"}
+# Nav order; categories not listed follow alphabetically
+PREFERRED = ["India", "World", "Local", "Business",
+             "Technology", "Entertainment", "Sports", "Science", "Health"]
+
+
+def load_category_list():
+    """The nav categories straight from the database: one DISTINCT query."""
+    names = (Article.objects
+             .filter(is_verified=True)
+             .exclude(category__isnull=True)
+             .exclude(category__exact='')
+             .exclude(category__iexact='General')
+             .values_list('category', flat=True)
+             .distinct())
+    have = {c.strip() for c in names if c and c.strip()} - EXCLUDED
+    ordered = [c for c in PREFERRED if c in have]
+    return ordered + sorted(have.difference(ordered))
+
+
+def cache_key() -> str:
+    return f"{CACHE_KEY}:{pagecache.generation()}"
+
+
+def category_list():
+    key = cache_key()
+    categories = cache.get(key)
+    if categories is None:
+        categories = load_category_list()
+        cache.set(key, categories, CACHE_TTL)
+    return categories
+
+
+def invalidate():
+    cache.delete(cache_key())
+
+
+def invalidate_on_commit():
+    """Drop the cached list once the current transaction commits (immediately outside one)."""
+    transaction.on_commit(invalidate)
@@ -0,0 +1,111 @@
+# news_feed/clustering.py
+"""
+Near-duplicate story clustering for headlines.
+
+Every title becomes a MinHash signature over its word tokens. Signatures are
+cut into LSH bands, so a new headline is only compared with the stories it
+shares a band bucket with instead of with every title seen so far.
+"""
+import hashlib
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from news_feed.utils import norm_text
+
+NUM_PERM = 64                 # signature length
+BANDS = 16                    # LSH bands of NUM_PERM // BANDS rows each
+ROWS = NUM_PERM // BANDS
+MATCH_THRESHOLD = 0.5         # estimated Jaccard needed to join an existing story
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20251018)   # fixed: signatures are stored and must stay comparable
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+STOPWORDS = frozenset("""
+    a an the of to in on at by for from with and or but as is are was were be been
+    has have had it its this that after over into amid says said new will can
+""".split())
+
+
+def title_tokens(title: str) -> set:
+    tokens = (t.strip(".:/-") for t in norm_text(title).split())
+    return {t for t in tokens if len(t) > 1 and t not in STOPWORDS}
+
+
+def minhash(title: str):
+    """MinHash signature (uint32 array of NUM_PERM) of a headline, or None if it has no tokens."""
+    tokens = title_tokens(title)
+    if not tokens:
+        return None
+    x = np.fromiter((zlib.crc32(t.encode()) for t in tokens), dtype=np.uint64, count=len(tokens))
+    # (a*x + b) mod p for every permutation/token pair, smallest value per permutation
+    return ((np.outer(_A, x) + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def signature_from_bytes(raw):
+    return np.frombuffer(bytes(raw), dtype=np.uint32) if raw else None
+
+
+def similarity(a, b) -> float:
+    """Estimated Jaccard similarity of the token sets behind two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def story_key_for(signature) -> str:
+    return hashlib.blake2b(signature.tobytes(), digest_size=8).hexdigest()
+
+
+def _bands(signature):
+    for i in range(BANDS):
+        yield i, signature[i * ROWS:(i + 1) * ROWS].tobytes()
+
+
+class StoryIndex:
+    """In-memory LSH index: band bucket -> story keys, story key -> signature of its first member."""
+
+    def __init__(self, threshold: float = MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.buckets = defaultdict(set)
+        self.signatures = {}
+
+    @classmethod
+    def from_rows(cls, rows, **kwargs):
+        """Build from (story_key, signature bytes) pairs, e.g. stored articles."""
+        index = cls(**kwargs)
+        for key, raw in rows:
+            signature = signature_from_bytes(raw)
+            if key and signature is not None and len(signature) == NUM_PERM:
+                index.add(key, signature)
+        return index
+
+    def add(self, key: str, signature):
+        self.signatures.setdefault(key, signature)
+        for band in _bands(signature):
+            self.buckets[band].add(key)
+
+    def match(self, signature):
+        """Best existing story for a signature, or None when nothing is similar enough."""
+        candidates = set()
+        for band in _bands(signature):
+            candidates |= self.buckets.get(band, set())
+        best, best_score = None, self.threshold
+        for key in candidates:
+            score = similarity(signature, self.signatures[key])
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def assign(self, title: str):
+        """
+        Place a headline in the index. Returns (story_key, signature); the key
+        is new when no stored story is similar enough, ("", None) for empty titles.
+        """
+        signature = minhash(title)
+        if signature is None:
+            return "", None
+        key = self.match(signature) or story_key_for(signature)
+        self.add(key, signature)
+        return key, signature
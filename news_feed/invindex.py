@@ -0,0 +1,338 @@
+# news_feed/invindex.py
+"""
+In-process inverted index over article titles and summaries, for
+deployments that search without a full-text database (SEARCH_BACKEND =
+"inverted_index", see news_feed/search.py).
+
+The index is immutable and array-backed (CSR layout): a sorted vocabulary,
+one offsets array, and the postings of vocab[i] in
+postings_doc/postings_tf[offsets[i]:offsets[i + 1]]. Tokens are
+norm_text() words, as in clustering. Queries match every term as a prefix
+(a bisect range in the sorted vocabulary) and rank with BM25 in numpy,
+without touching the database.
+
+It lives in one file (SEARCH_INDEX_FILE) that every process memory-maps,
+so web workers share one copy of the postings in the page cache instead of
+each building their own. Writers -- the ingest after a run, add_article_api
+-- fold their changes into a new index and swap the file in atomically;
+readers notice the new mtime on their next search and remap. The file is
+built at deploy (`manage.py build_search_index --if-missing`); a process
+that finds it missing builds it once under the writer lock, the others
+wait for that build instead of repeating it.
+"""
+import bisect
+import json
+import mmap
+import os
+import threading
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from news_feed.models import Article
+from news_feed.utils import norm_text
+
+try:
+    import fcntl   # not on Windows
+except ImportError:
+    fcntl = None
+
+# Writers need a cross-process lock, and readers keep the file mapped while
+# writers replace it, which Windows refuses. Without fcntl the backend is
+# unavailable: search.uses_inverted_index() says no and a system check warns.
+SUPPORTED = fcntl is not None
+
+TITLE_WEIGHT = 3        # a title occurrence counts as this many summary ones
+K1, B = 1.2, 0.75       # BM25 parameters
+MAX_QUERY_TERMS = 8     # longer queries are cut here
+MAX_EXPANSIONS = 64     # vocabulary terms one query prefix may expand to
+BUILD_CHUNK = 2000      # rows fetched per round trip while indexing
+
+MAGIC = b"NFINVIX1"
+_SECTIONS = [
+    ("doc_ids", np.int64),        # position -> Article.id
+    ("doc_lens", np.float32),     # weighted token count per document
+    ("offsets", np.int64),
+    ("postings_doc", np.int32),
+    ("postings_tf", np.float32),
+    ("vocab", np.uint8),          # "\n"-joined UTF-8 terms
+]
+
+
+def tokens(text: str) -> list:
+    return [t for t in (t.strip(".:/-") for t in norm_text(text).split()) if t]
+
+
+def document_terms(title: str, summary: str) -> Counter:
+    tf = Counter(tokens(summary))
+    for t in tokens(title):
+        tf[t] += TITLE_WEIGHT
+    return tf
+
+
+def _aligned(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class InvertedIndex:
+    def __init__(self, doc_ids, doc_lens, vocab, offsets, postings_doc, postings_tf, buffer=None):
+        self.doc_ids = doc_ids
+        self.doc_lens = doc_lens
+        self.vocab = vocab
+        self.offsets = offsets
+        self.postings_doc = postings_doc
+        self.postings_tf = postings_tf
+        self._buffer = buffer   # the mmap the arrays are views of, when loaded from a file
+        avg_len = float(doc_lens.mean()) if len(doc_lens) else 1.0
+        # per-document BM25 length normalisation, the same for every query
+        self._norm = (K1 * (1 - B + B * doc_lens / max(avg_len, 1e-9))).astype(np.float32)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros(0, np.int64), np.zeros(0, np.float32), [], np.zeros(1, np.int64),
+                   np.zeros(0, np.int32), np.zeros(0, np.float32))
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    # -- updates -------------------------------------------------------
+
+    def updated(self, docs, removed=()):
+        """
+        A new index with `docs` ((article_id, title, summary) tuples) added,
+        replacing any earlier version of the same article, and `removed`
+        article ids left out. Only the new documents are tokenised; the
+        existing postings are carried over with array operations.
+        """
+        ids, lens = array("q"), array("f")
+        new_terms = {}
+        p_term, p_doc, p_tf = array("i"), array("i"), array("f")
+        for article_id, title, summary in docs:
+            tf = document_terms(title, summary)
+            doc = len(ids)
+            ids.append(article_id)
+            lens.append(sum(tf.values()))
+            for term, count in tf.items():
+                p_term.append(new_terms.setdefault(term, len(new_terms)))
+                p_doc.append(doc)
+                p_tf.append(count)
+        ids = np.frombuffer(ids, np.int64) if ids else np.zeros(0, np.int64)
+
+        drop = np.concatenate([np.fromiter(removed, np.int64), ids])
+        keep = ~np.isin(self.doc_ids, drop)
+        n_kept = int(keep.sum())
+        position = np.cumsum(keep) - 1   # old document position -> new one
+
+        vocab = sorted(set(self.vocab).union(new_terms))
+        index_of = {t: i for i, t in enumerate(vocab)}
+        old_term = np.array([index_of[t] for t in self.vocab], np.int64)
+        new_term = np.array([index_of[t] for t in new_terms], np.int64)
+
+        posting_term = np.repeat(np.arange(len(self.vocab)), np.diff(self.offsets))
+        live = keep[self.postings_doc]
+        terms = np.concatenate([old_term[posting_term[live]], new_term[np.asarray(p_term, np.int64)]])
+        docs_ = np.concatenate([position[self.postings_doc[live]],
+                                n_kept + np.asarray(p_doc, np.int64)]).astype(np.int32)
+        tf = np.concatenate([self.postings_tf[live], np.asarray(p_tf, np.float32)])
+
+        order = np.lexsort((docs_, terms))
+        terms, docs_, tf = terms[order], docs_[order], tf[order]
+        counts = np.bincount(terms, minlength=len(vocab))
+        if len(vocab) and not counts.all():
+            # terms whose documents were all removed leave the vocabulary
+            used = counts > 0
+            vocab = [t for t, u in zip(vocab, used) if u]
+            terms = (np.cumsum(used) - 1)[terms]
+            counts = counts[used]
+        offsets = np.zeros(len(vocab) + 1, np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return InvertedIndex(
+            np.concatenate([self.doc_ids[keep], ids]),
+            np.concatenate([self.doc_lens[keep], np.asarray(lens, np.float32)]),
+            vocab, offsets, docs_, tf,
+        )
+
+    # -- queries -------------------------------------------------------
+
+    def search(self, text: str, k: int):
+        """Top-k (article_id, score), best first, of documents matching every query term."""
+        terms = list(dict.fromkeys(tokens(text)))[:MAX_QUERY_TERMS]
+        n = len(self.doc_ids)
+        if not terms or not n:
+            return []
+        scores = np.zeros(n, np.float32)
+        matched = np.zeros(n, np.int16)
+        for term in terms:
+            lo = bisect.bisect_left(self.vocab, term)
+            hi = min(bisect.bisect_left(self.vocab, term + "\U0010ffff", lo), lo + MAX_EXPANSIONS)
+            if lo == hi:
+                return []   # a term nothing starts with: no document has them all
+            start, stop = self.offsets[lo], self.offsets[hi]
+            df = np.diff(self.offsets[lo:hi + 1])
+            idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+            docs = self.postings_doc[start:stop]
+            tf = self.postings_tf[start:stop]
+            weight = np.repeat(idf, df) * tf * (K1 + 1) / (tf + self._norm[docs])
+            # bincount sums a document's hits on several expansions of one prefix
+            term_scores = np.bincount(docs, weights=weight, minlength=n)
+            matched += term_scores > 0
+            scores += term_scores.astype(np.float32)
+
+        hits = np.flatnonzero(matched == len(terms))
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(int(self.doc_ids[i]), float(scores[i])) for i in hits]
+
+    # -- persistence ---------------------------------------------------
+
+    def save(self, path):
+        """Write the index to `path` in one step (temp file + rename); open mappings stay valid."""
+        arrays = {
+            "doc_ids": self.doc_ids, "doc_lens": self.doc_lens, "offsets": self.offsets,
+            "postings_doc": self.postings_doc, "postings_tf": self.postings_tf,
+            "vocab": np.frombuffer("\n".join(self.vocab).encode(), np.uint8),
+        }
+        layout, offset = {}, 0
+        for name, dtype in _SECTIONS:
+            layout[name] = [offset, len(arrays[name])]
+            offset = _aligned(offset + len(arrays[name]) * np.dtype(dtype).itemsize)
+        header = json.dumps({"docs": len(self), "sections": layout}).encode()
+        header += b" " * (_aligned(len(header)) - len(header))
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + len(header).to_bytes(8, "little") + header)
+            for name, dtype in _SECTIONS:
+                data = np.ascontiguousarray(arrays[name], dtype).tobytes()
+                f.write(data + b"\0" * (_aligned(len(data)) - len(data)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Map an index file written by save(); the arrays read straight from the page cache."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:8] != MAGIC:
+            raise ValueError(f"{path} is not a search index file")
+        header_len = int.from_bytes(buffer[8:16], "little")
+        header = json.loads(buffer[16:16 + header_len])
+        base = 16 + header_len
+        arrays = {
+            name: np.frombuffer(buffer, dtype, header["sections"][name][1], base + header["sections"][name][0])
+            for name, dtype in _SECTIONS
+        }
+        blob = arrays.pop("vocab").tobytes().decode()
+        return cls(vocab=blob.split("\n") if blob else [], buffer=buffer, **arrays)
+
+
+# ------------------------------------------------------------------
+# The shared index file: one mapping per process, one writer at a time.
+# ------------------------------------------------------------------
+_lock = threading.Lock()
+_current = None   # (index, mtime_ns of the file it was loaded from)
+
+
+def index_path() -> Path:
+    return Path(getattr(settings, "SEARCH_INDEX_FILE", settings.BASE_DIR / "search_index.bin"))
+
+
+@contextmanager
+def _writing(path):
+    """Serialise writers across processes, so no update is lost to a concurrent one."""
+    if not SUPPORTED:
+        raise RuntimeError("the in-process search index needs fcntl file locks, which this platform lacks")
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _rows(queryset):
+    return (queryset.filter(is_verified=True)
+            .values_list("id", "title", "summary")
+            .iterator(chunk_size=BUILD_CHUNK))
+
+
+def _changes(queryset):
+    """(rows to index, ids to drop) for written articles: ones no longer verified leave the index."""
+    rows, dropped = [], []
+    for pk, verified, title, summary in (queryset.values_list("id", "is_verified", "title", "summary")
+                                         .iterator(chunk_size=BUILD_CHUNK)):
+        if verified:
+            rows.append((pk, title, summary))
+        else:
+            dropped.append(pk)
+    return rows, dropped
+
+
+def _build(path) -> InvertedIndex:
+    index = InvertedIndex.empty().updated(_rows(Article.objects.all()))
+    index.save(path)
+    return index
+
+
+def build(path=None) -> InvertedIndex:
+    """Index every verified article and write the file (also what build_search_index runs)."""
+    path = path or index_path()
+    with _writing(path):
+        return _build(path)
+
+
+def ensure_index(path=None) -> bool:
+    """Build the file unless it exists; True if this call built it."""
+    path = Path(path or index_path())
+    if path.exists():
+        return False
+    with _writing(path):
+        if path.exists():   # built by another process while we waited for the lock
+            return False
+        _build(path)
+    return True
+
+
+def update_index(queryset=None, removed=()):
+    """
+    Fold the articles of `queryset` (added or changed) and the `removed` ids
+    into the file: verified articles are (re)indexed, the others dropped.
+    """
+    rows, dropped = _changes(queryset) if queryset is not None else ([], [])
+    removed = [*removed, *dropped]
+    if not rows and not removed:
+        return   # nothing changed: leave the file alone
+    path = index_path()
+    with _writing(path):
+        if not path.exists():
+            _build(path)   # a fresh build already sees the changes
+            return
+        InvertedIndex.load(path).updated(rows, removed).save(path)
+
+
+def current_index() -> InvertedIndex:
+    """This process's mapping of the index file, remapped after every update."""
+    global _current
+    path = index_path()
+    with _lock:
+        if ensure_index(path):
+            print(f"[search-index] {path} was missing and has been built; "
+                  "run `manage.py build_search_index --if-missing` at deploy")
+        mtime = os.stat(path).st_mtime_ns
+        if _current is None or _current[1] != mtime:
+            _current = (InvertedIndex.load(path), mtime)
+        return _current[0]
+
+
+def reset():
+    """Forget this process's mapping (tests, or after moving the file)."""
+    global _current
+    with _lock:
+        _current = None
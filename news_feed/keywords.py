@@ -0,0 +1,90 @@
+# news_feed/keywords.py
+"""
+Headline keyword matching for the ingest command.
+
+Every category keyword and credibility keyword is compiled into a single
+word-bounded regex at import time, so classify() reads a headline once and
+returns both its category and its credibility adjustment. The regex takes
+the longest phrase at each position, so a match also counts the shorter
+keywords inside it ("researchers discover" is a Science match through
+"researchers") and rule order still decides the category.
+"""
+import re
+from collections import namedtuple
+
+TECH_KWS = {
+    "ai", "artificial intelligence", "semiconductor", "chip",
+    "processor", "smartphone", "iphone", "android", "laptop",
+    "startup", "software", "app", "gadget", "cyber-security",
+    "cloud", "iot", "vr", "ar", "robot", "quantum",
+}
+
+SPORTS_KWS = {
+    "ipl", "t20", "cricket", "fifa", "football", "nba","tournament", "match-day", "fixture", "umpire",
+    "innings", "wicket", "goal-line", "transfer window","olympic", "premier league", "world cup", "grand prix",
+}
+SCIENCE_KWS={
+    "nasa", "space", "astronomy", "planet", "galaxy",
+    "quantum", "physics", "chemistry", "biology",
+    "researchers", "laboratory", "telescope", "neutron",
+    "particle", "genome", "climate study",
+}
+
+# Checked in this order; the first label with a matching keyword wins.
+CATEGORY_RULES = [
+    ('Sports', ['ipl','cricket','t20','football','fifa','olympic','world cup','asia cup','hockey','kabaddi','nba',
+                'match','runs','wicket','goal','sports']),
+    ('Sports', SPORTS_KWS),
+    ('Science', SCIENCE_KWS),
+    ('Technology', TECH_KWS),
+    ('Technology', ['ai','semiconductor','chip','software','startup','app','iphone','android','artificial intelligence',
+                    'iot','cloud computing','satellite','spacex','cyber-security','technology']),
+    ('Business', ['budget','gdp','inflation','stocks','market','sensex','nifty','merger','companies','board','invest','finance','ipo']),
+    ('Health', ['vaccine','covid','health','hospital','disease','outbreak']),
+    ('Science', ['research','nasa','isro','astronomy','physics','climate study','spacex','quantum','researchers discover',
+                 'galaxy','cosmic','asteroid','black hole']),
+    ('Entertainment', ['film','movie','box office','series','bollywood','hollywood','actor','actress']),
+    ('Local', ['city','district','municipal','local body','ward']),
+    ('India', ['india','parliament','delhi','supreme court','pm']),
+    ('World', ['world','global','united nations','ukraine','gaza','us','eu']),
+]
+DEFAULT_CATEGORY = "News Showcase"
+
+# Positive keywords suggest official or factual reporting, negative ones speculation or opinion
+CREDIBILITY_KEYWORDS = {
+    "exclusive": 5, "analysis": 5, "investigation": 5, "official statement": 5, "confirmed": 5,
+    "rumor": -5, "speculation": -5, "opinion": -5, "could be": -5, "may have": -5,
+}
+
+Headline = namedtuple("Headline", ["category", "score_adjustment"])
+
+
+def _build():
+    priority = {}
+    for rank, (_, kws) in enumerate(CATEGORY_RULES):
+        for kw in kws:
+            priority.setdefault(kw, rank)
+    words = set(priority) | set(CREDIBILITY_KEYWORDS)
+    # Longest first so "world cup" wins over "world"; a plural "s" still matches.
+    alternation = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+    # Every keyword a phrase contains, the phrase included: what one match of it stands for
+    contains = {}
+    for phrase in words:
+        contains[phrase] = {kw for kw in words if kw == phrase
+                            or re.search(rf"\b{re.escape(kw)}s?\b", phrase)}
+    return re.compile(rf"\b({alternation})s?\b"), priority, contains
+
+
+_PATTERN, _PRIORITY, _CONTAINS = _build()
+
+
+def classify(title: str) -> Headline:
+    """Category and credibility adjustment of a headline from one scan of it."""
+    best = len(CATEGORY_RULES)
+    seen = set()
+    for match in _PATTERN.finditer((title or "").lower()):
+        for kw in _CONTAINS[match.group(1)] - seen:
+            seen.add(kw)
+            best = min(best, _PRIORITY.get(kw, best))
+    category = CATEGORY_RULES[best][0] if best < len(CATEGORY_RULES) else DEFAULT_CATEGORY
+    return Headline(category, sum(CREDIBILITY_KEYWORDS.get(kw, 0) for kw in seen))
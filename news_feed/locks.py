@@ -0,0 +1,99 @@
+# news_feed/locks.py
+"""
+Single-flight locks backed by IngestLock rows.
+
+Taking a lock is one conditional UPDATE (free or expired -> ours), so it is
+atomic on every database Django supports and never blocks: whoever loses the
+race simply gets False back and skips the job.
+"""
+import os
+import socket
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from news_feed.models import IngestLock
+
+INGEST = "ingest"
+LOCK_TTL = timedelta(minutes=30)   # a holder that dies (stops renewing) is assumed gone after this
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _ensure_row(name: str):
+    if not IngestLock.objects.filter(name=name).exists():
+        try:
+            with transaction.atomic():
+                IngestLock.objects.create(name=name)
+        except IntegrityError:
+            pass  # created by a concurrent caller
+
+
+def acquire(name: str = INGEST, ttl: timedelta = LOCK_TTL):
+    """Take the lock if nobody holds it. Returns the owner token, or None."""
+    _ensure_row(name)
+    now = timezone.now()
+    owner = _owner()
+    taken = (
+        IngestLock.objects
+        .filter(name=name)
+        .filter(Q(locked_until__isnull=True) | Q(locked_until__lte=now))
+        .update(owner=owner, locked_until=now + ttl, last_started_at=now)
+    )
+    return owner if taken else None
+
+
+def renew(owner: str, name: str = INGEST, ttl: timedelta = LOCK_TTL) -> bool:
+    """Heartbeat: push our lease out to now + ttl. False if the lock is no longer ours."""
+    return bool(IngestLock.objects.filter(name=name, owner=owner, locked_until__isnull=False).update(
+        locked_until=timezone.now() + ttl,
+    ))
+
+
+def release(owner: str, name: str = INGEST):
+    """Give the lock back; a no-op if it already expired and someone else took it."""
+    IngestLock.objects.filter(name=name, owner=owner).update(
+        locked_until=None, last_finished_at=timezone.now(),
+    )
+
+
+@contextmanager
+def single_flight(name: str = INGEST, ttl: timedelta = LOCK_TTL):
+    """
+    with single_flight() as held:
+        if not held: return   # another process is already running the job
+
+    `held` is the owner token (None when the lock was busy); a long job
+    passes it to renew() as it makes progress so the lease never runs out.
+    """
+    owner = acquire(name, ttl)
+    try:
+        yield owner
+    finally:
+        if owner:
+            release(owner, name)
+
+
+def claim_trigger(interval: timedelta, name: str = INGEST) -> bool:
+    """
+    True for exactly one caller per interval, and only when the job is neither
+    running nor has finished within the interval (e.g. because the daemon or
+    cron already ran it). One UPDATE, no waiting.
+    """
+    _ensure_row(name)
+    now = timezone.now()
+    cutoff = now - interval
+    return bool(
+        IngestLock.objects
+        .filter(name=name)
+        .filter(Q(locked_until__isnull=True) | Q(locked_until__lte=now))
+        .filter(Q(last_finished_at__isnull=True) | Q(last_finished_at__lt=cutoff))
+        .filter(Q(last_triggered_at__isnull=True) | Q(last_triggered_at__lt=cutoff))
+        .update(last_triggered_at=now)
+    )
@@ -0,0 +1,57 @@
+# news_feed/management/commands/benchmark_ingest.py
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from news_feed.bench import FIXTURES_DIR, run_benchmark
+
+
+class Command(BaseCommand):
+    help = ("Replays recorded feeds and article pages through fetch_and_verify_news at "
+            "several volumes, offline, on a throwaway test database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                            help="Feed volume multipliers to run (default: 1 10 100).")
+        parser.add_argument("--latency", type=float, default=0.0,
+                            help="Simulated network latency per request, in milliseconds.")
+        parser.add_argument("--fixtures", default=str(FIXTURES_DIR),
+                            help="Directory with manifest.json, feeds/ and pages/.")
+        parser.add_argument("--no-memory", action="store_true",
+                            help="Skip the second, tracemalloc-instrumented pass per scale.")
+        parser.add_argument("--output", metavar="PATH",
+                            help="Also write the results as JSON to PATH.")
+
+    def handle(self, *args, **options):
+        # The test database settings apply (DATABASES['default']['TEST']); with
+        # SQLite that is in-memory unless TEST['NAME'] points at a file.
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = [self.run_scale(scale, options) for scale in options["scales"]]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+    def run_scale(self, scale, options):
+        latency = options["latency"] / 1000
+        # Timings come from an untraced run; tracemalloc slows allocation-heavy code down.
+        result = run_benchmark(scale, latency, fixtures_dir=options["fixtures"])
+        if not options["no_memory"]:
+            traced = run_benchmark(scale, latency, trace_memory=True, fixtures_dir=options["fixtures"])
+            result["peak_mb"] = traced["peak_mb"]
+            result["max_rss_mb"] = traced["max_rss_mb"]
+
+        slowest = sorted(result["stages"].items(), key=lambda item: item[1], reverse=True)[:3]
+        self.stdout.write(
+            f"{scale:>4}x  {result['feeds']:>5} feeds  {result['entries']:>6} entries  "
+            f"{result['articles_saved']:>6} saved  {result['seconds']:>7.2f}s  "
+            f"{result['entries_per_s']:>8} entries/s  db {result['db_write_s']:.2f}s  "
+            f"peak {result['peak_mb'] if result['peak_mb'] is not None else '-'} MB  | "
+            + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in slowest)
+        )
+        return result
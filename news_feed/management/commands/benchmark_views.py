@@ -0,0 +1,58 @@
+# news_feed/management/commands/benchmark_views.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from news_feed.bench.views import QUERY_BUDGETS, over_budget, run_view_benchmark, seed_articles
+
+
+class Command(BaseCommand):
+    help = ("Seeds N articles into a throwaway test database, requests every news view and "
+            "reports latency percentiles and SQL query counts; fails when a budget is exceeded.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--articles", type=int, nargs="+", default=[10_000],
+                            help="Table sizes to measure, e.g. 10000 100000 1000000.")
+        parser.add_argument("--repeat", type=int, default=20,
+                            help="Timed requests per view (after one warm-up).")
+        parser.add_argument("--max-p95-ms", type=float,
+                            help="Also fail when any view's p95 latency is above this.")
+        parser.add_argument("--page-cache", action="store_true",
+                            help="Leave the anonymous feed page cache on (cache hits after the warm-up).")
+        parser.add_argument("--output", metavar="PATH",
+                            help="Also write the results as JSON to PATH.")
+
+    def handle(self, *args, **options):
+        # DATABASES['default']['TEST'] applies; point TEST['NAME'] at a file
+        # (or another engine) to measure something closer to production.
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        results, problems = {}, []
+        try:
+            seeded = 0
+            for n in sorted(options["articles"]):
+                self.stdout.write(f"Seeding {n - seeded} articles (table size {n})...")
+                seeded += seed_articles(n - seeded, seed=n)
+                results[n] = run_view_benchmark(repeat=options["repeat"], page_cache=options["page_cache"])
+                self.report(n, results[n])
+                problems += [f"[{n} articles] {p}" for p in
+                             over_budget(results[n], QUERY_BUDGETS, options["max_p95_ms"])]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        if problems:
+            raise CommandError("Budget exceeded:\n  " + "\n  ".join(problems))
+        self.stdout.write(self.style.SUCCESS("All views within budget."))
+
+    def report(self, n, results):
+        self.stdout.write(f"{'view':<14} {'status':>6} {'queries':>7} {'budget':>6} "
+                          f"{'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'KB':>8}")
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<14} {r['status']:>6} {r['queries']:>7} {QUERY_BUDGETS.get(name, '-'):>6} "
+                f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['max_ms']:>9} {r['bytes'] / 1024:>8.1f}"
+            )
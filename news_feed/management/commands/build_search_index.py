@@ -0,0 +1,29 @@
+# news_feed/management/commands/build_search_index.py
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from news_feed import invindex
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the in-process search index file (SEARCH_BACKEND = 'inverted_index') from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=None,
+                            help="Index file to write (default: settings.SEARCH_INDEX_FILE).")
+        parser.add_argument("--if-missing", action="store_true",
+                            help="Only build when the file does not exist yet (for deploy and startup scripts).")
+
+    def handle(self, *args, **options):
+        path = options["path"] or invindex.index_path()
+        if options["if_missing"] and os.path.exists(path):
+            self.stdout.write(f"{path} exists, nothing to do.")
+            return
+        started = time.perf_counter()
+        index = invindex.build(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(index)} articles, {len(index.vocab)} terms, {len(index.postings_doc)} postings "
+            f"in {time.perf_counter() - started:.2f}s -> {path}"
+        ))
@@ -0,0 +1,146 @@
+# news_feed/management/commands/run_ingest_daemon.py
+import json
+import os
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.db.models import Min
+from django.utils import timezone
+
+from news_feed.models import Feed
+
+# ------------------------------------------------------------------
+# One long-lived ingest worker instead of a process per run.
+# Django, feedparser/BeautifulSoup and the HTTP session stay loaded,
+# so every run after the first starts with warm connection pools.
+# ------------------------------------------------------------------
+MIN_SLEEP = 60          # seconds; never poll more often than this
+MAX_SLEEP = 15 * 60     # seconds; wake up at least this often to pick up new feeds
+HEALTH_FILE = getattr(settings, "INGEST_HEALTH_FILE", settings.BASE_DIR / "ingest_health.json")
+
+
+def seconds_until_next_poll(min_sleep=MIN_SLEEP, max_sleep=MAX_SLEEP) -> float:
+    """Time until the earliest active feed is due, clamped to [min_sleep, max_sleep]."""
+    next_poll = Feed.objects.filter(is_active=True).aggregate(at=Min("next_poll_at"))["at"]
+    if next_poll is None:
+        return max_sleep
+    wait = (next_poll - timezone.now()).total_seconds()
+    return min(max(wait, min_sleep), max_sleep)
+
+
+def write_health(path, **status):
+    """Replace the health file in one step, so readers never see half a document."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+def read_health(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Runs fetch_and_verify_news in-process whenever feeds are due, until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--health-file", default=str(HEALTH_FILE),
+                            help="JSON status file rewritten after every run.")
+        parser.add_argument("--min-sleep", type=float, default=MIN_SLEEP,
+                            help="Fewest seconds between two runs.")
+        parser.add_argument("--max-sleep", type=float, default=MAX_SLEEP,
+                            help="Most seconds between two runs.")
+        parser.add_argument("--once", action="store_true",
+                            help="Do a single run and exit.")
+        parser.add_argument("--check", action="store_true",
+                            help="Exit non-zero unless the health file shows a live daemon "
+                                 "(for container or supervisor health checks).")
+
+    def handle(self, *args, **options):
+        health_file = options["health_file"]
+        if options["check"]:
+            return self.check_health(health_file, options["max_sleep"])
+
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            # Let the current run finish; its writes are already in a transaction.
+            self.stdout.write(f"Received {signal.Signals(signum).name}, stopping after the current run...")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        status = {
+            "pid": os.getpid(),
+            "state": "starting",
+            "started_at": timezone.now(),
+            "runs": 0,
+            "failures": 0,
+            "last_run_started_at": None,
+            "last_run_finished_at": None,
+            "last_run_seconds": None,
+            "last_error": "",
+            "next_run_at": None,
+        }
+        write_health(health_file, **status)
+        self.stdout.write(f"Ingest daemon started (pid {status['pid']}), health file {health_file}")
+
+        while not stop.is_set():
+            close_old_connections()
+            status.update(state="running", last_run_started_at=timezone.now())
+            write_health(health_file, **status)
+
+            started = time.perf_counter()
+            try:
+                call_command("fetch_and_verify_news", stdout=self.stdout, stderr=self.stderr)
+                status["last_error"] = ""
+            except Exception as e:
+                # One bad run must not take the worker down; the next one retries.
+                status["failures"] += 1
+                status["last_error"] = f"{type(e).__name__}: {e}"
+                self.stderr.write(f"Ingest run failed: {status['last_error']}")
+            finally:
+                close_old_connections()
+            status["runs"] += 1
+            status["last_run_seconds"] = round(time.perf_counter() - started, 2)
+            status["last_run_finished_at"] = timezone.now()
+
+            if options["once"]:
+                break
+
+            sleep_for = seconds_until_next_poll(options["min_sleep"], options["max_sleep"])
+            status.update(state="sleeping", next_run_at=timezone.now() + timedelta(seconds=sleep_for))
+            write_health(health_file, **status)
+            stop.wait(sleep_for)
+
+        status.update(state="stopped", next_run_at=None)
+        write_health(health_file, **status)
+        self.stdout.write("Ingest daemon stopped.")
+
+    def check_health(self, health_file, max_sleep):
+        status = read_health(health_file)
+        if status is None:
+            raise CommandError(f"No health file at {health_file}")
+        if status.get("state") == "stopped":
+            raise CommandError("Ingest daemon is stopped")
+        try:
+            os.kill(status["pid"], 0)
+        except (OSError, KeyError, TypeError):
+            raise CommandError(f"Ingest daemon process {status.get('pid')} is not running")
+        # A sleeping daemon is overdue once it misses its wake-up by a full cycle.
+        last_seen = status.get("next_run_at") or status.get("last_run_started_at") or status.get("started_at")
+        overdue = timezone.now() - datetime.fromisoformat(last_seen)
+        if status.get("state") == "sleeping" and overdue > timedelta(seconds=max_sleep):
+            raise CommandError(f"Ingest daemon missed its run at {last_seen}")
+        self.stdout.write(f"ok: {status['state']}, {status['runs']} runs, last error: {status['last_error'] or 'none'}")
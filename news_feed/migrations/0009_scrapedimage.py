@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_feed', '0008_feedstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapedImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_key', models.CharField(max_length=500, unique=True)),
+                ('image_url', models.URLField(blank=True, default='', max_length=500)),
+                ('checked_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:05
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def dedupe_articles(apps, schema_editor):
+    """
+    Keep the newest row of every (title, source_url) pair so the unique
+    constraint can be created. Feedback on the dropped copies moves to it.
+    """
+    Article = apps.get_model('news_feed', 'Article')
+    Feedback = apps.get_model('news_feed', 'Feedback')
+    dupes = (Article.objects.values('title', 'source_url')
+             .annotate(n=Count('id'), keep=Max('id'))
+             .filter(n__gt=1))
+    for group in dupes:
+        extra = (Article.objects
+                 .filter(title=group['title'], source_url=group['source_url'])
+                 .exclude(pk=group['keep']))
+        Feedback.objects.filter(article__in=extra).update(article_id=group['keep'])
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_feed', '0009_scrapedimage'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_articles, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='article',
+            constraint=models.UniqueConstraint(fields=('title', 'source_url'), name='uniq_title_sourceurl'),
+        ),
+    ]
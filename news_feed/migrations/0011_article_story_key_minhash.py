@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_feed', '0010_article_uniq_title_sourceurl'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='story_key',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=16),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_feed', '0011_article_story_key_minhash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=16, unique=True)),
+                ('signature', models.BinaryField()),
+                ('source_count', models.IntegerField(default=0)),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StoryClusterSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_name', models.CharField(max_length=100)),
+                ('cluster', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='news_feed.storycluster')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('cluster', 'source_name'), name='uniq_cluster_source')],
+            },
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:20
+
+import datetime
+
+from django.db import migrations, models
+
+HOUR = datetime.timedelta(hours=1)
+
+# The list that used to be hard-coded in fetch_and_verify_news, without the
+# duplicate NASA entry and the newsapi.org landing page (not a feed).
+DEFAULT_FEEDS = [
+    ('Technology', 'https://news.google.com/rss/topics/CAAqJggKIiBDQkFTRWdvSUwyMHZNRGRqTVhZU0FtVnVHZ0pKVGlnQVAB?hl=en-IN&gl=IN&ceid=IN:en', HOUR / 2),
+    ('Technology', 'https://www.wired.com/feed/rss', HOUR),
+    ('Technology', 'https://techcrunch.com/feed/', HOUR),
+    ('Sports', 'https://feeds.bbci.co.uk/sport/rss.xml', HOUR / 2),
+    ('Sports', 'https://www.espn.com/espn/rss/news', HOUR / 2),
+    ('Sports', 'https://www.espncricinfo.com/rss/content/story/feeds/0.xml', HOUR / 2),
+    ('Business', 'https://economictimes.indiatimes.com/rssfeeds/1977021501.cms', HOUR),
+    ('Business', 'https://www.indianewsnetwork.com/rss.en.business.xml', 6 * HOUR),
+    ('Business', 'https://www.livemint.com/rss/companies', HOUR),
+    ('Entertainment', 'http://feeds.bbci.co.uk/news/entertainment_and_arts/rss.xml', 2 * HOUR),
+    ('Entertainment', 'https://www.hollywoodreporter.com/feed/', 2 * HOUR),
+    ('News Showcase', 'https://www.thehindu.com/news/national/feeder/default.rss', HOUR / 2),
+    ('World', 'https://www.aljazeera.com/xml/rss/all.xml', HOUR / 2),
+    ('World', 'https://feeds.bbci.co.uk/news/world/rss.xml', HOUR / 2),
+    ('India', 'https://timesofindia.indiatimes.com/rssfeeds/1221656.cms', HOUR / 2),
+    ('Science', 'https://www.sciencedaily.com/rss/all.xml', 6 * HOUR),
+    ('Science', 'https://www.nasa.gov/rss/dyn/breaking_news.rss', 6 * HOUR),
+    ('Science', 'https://phys.org/rss-feed/', 6 * HOUR),
+    ('Science', 'https://www.theguardian.com/science/rss', 6 * HOUR),
+    ('Health', 'https://www.ruralhealthinfo.org/rss/news.xml', 24 * HOUR),
+    ('Health', 'https://www.medicinenet.com/rss/dailyhealth.xml', 24 * HOUR),
+    ('Health', 'https://www.fiercehealthcare.com/rss/xml', 6 * HOUR),
+    ('Health', 'https://www.who.int/rss-feeds/news-english.xml', 24 * HOUR),
+    ('Health', 'https://kffhealthnews.org/rss/', 6 * HOUR),
+]
+
+
+def seed_feeds(apps, schema_editor):
+    Feed = apps.get_model('news_feed', 'Feed')
+    for category, url, interval in DEFAULT_FEEDS:
+        Feed.objects.update_or_create(url=url, defaults={'category': category, 'poll_interval': interval})
+    # Validator rows of feeds that are no longer polled (e.g. the newsapi.org page)
+    Feed.objects.exclude(url__in=[url for _, url, _ in DEFAULT_FEEDS]).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_feed', '0012_storycluster'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='FeedState',
+            new_name='Feed',
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='name',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='category',
+            field=models.CharField(default='News Showcase', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='poll_interval',
+            field=models.DurationField(default=datetime.timedelta(seconds=3600)),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='next_poll_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='last_success_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='error_streak',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='last_error',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='avg_items',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(seed_feeds, migrations.RunPython.noop),
+    ]
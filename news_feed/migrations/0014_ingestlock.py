@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_feed', '0013_feed_registry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('owner', models.CharField(blank=True, default='', max_length=100)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('last_started_at', models.DateTimeField(blank=True, null=True)),
+                ('last_finished_at', models.DateTimeField(blank=True, null=True)),
+                ('last_triggered_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
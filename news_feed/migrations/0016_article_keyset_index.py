@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_feed', '0015_ingestrun'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='article',
+            name='news_feed_a_publica_8b6ad4_idx',
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-publication_date', '-id'], name='news_feed_a_publica_11ef4d_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:00
+
+from django.db import migrations
+
+# SQLite: an external-content FTS5 index over news_feed_article, kept in
+# sync by triggers (bulk upserts included, they fire the UPDATE trigger).
+# A later migration that makes SQLite rebuild news_feed_article (most
+# AlterField/RemoveField do) drops these triggers: recreate them there.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE news_feed_article_fts USING fts5(
+        title, summary,
+        content='news_feed_article', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER news_feed_article_fts_ai AFTER INSERT ON news_feed_article BEGIN
+        INSERT INTO news_feed_article_fts(rowid, title, summary)
+        VALUES (new.id, new.title, new.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER news_feed_article_fts_ad AFTER DELETE ON news_feed_article BEGIN
+        INSERT INTO news_feed_article_fts(news_feed_article_fts, rowid, title, summary)
+        VALUES ('delete', old.id, old.title, old.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER news_feed_article_fts_au AFTER UPDATE OF title, summary ON news_feed_article BEGIN
+        INSERT INTO news_feed_article_fts(news_feed_article_fts, rowid, title, summary)
+        VALUES ('delete', old.id, old.title, old.summary);
+        INSERT INTO news_feed_article_fts(rowid, title, summary)
+        VALUES (new.id, new.title, new.summary);
+    END
+    """,
+    "INSERT INTO news_feed_article_fts(news_feed_article_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS news_feed_article_fts_au",
+    "DROP TRIGGER IF EXISTS news_feed_article_fts_ad",
+    "DROP TRIGGER IF EXISTS news_feed_article_fts_ai",
+    "DROP TABLE IF EXISTS news_feed_article_fts",
+]
+
+# PostgreSQL: a generated, weighted tsvector column with a GIN index.
+# The model does not declare it, so the ORM never writes it.
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE news_feed_article ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX news_feed_article_search_idx ON news_feed_article USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS news_feed_article_search_idx",
+    "ALTER TABLE news_feed_article DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_feed', '0016_article_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_feed', '0017_article_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestlock',
+            name='generation',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from datetime import timedelta
 
 class Article(models.Model):
     title = models.CharField(max_length=255)
@@ -14,16 +15,52 @@ class Article(models.Model):
     image_analysis_score = models.IntegerField(default=0)
     source_name = models.CharField(max_length=100, default='Unknown')
     verified_by_sources = models.CharField(max_length=500, default='Not available')
+    # Near-duplicate story this article belongs to (see news_feed/clustering.py)
+    story_key = models.CharField(max_length=16, blank=True, default='', db_index=True)
+    minhash = models.BinaryField(null=True, blank=True)
 
     def __str__(self):
         return self.title
 
     class Meta:
         indexes = [
-            models.Index(fields=["-publication_date"]),
+            # Page order of the feeds (see news_feed/pagination.py)
+            models.Index(fields=["-publication_date", "-id"]),
             models.Index(fields=["-verified_at"]),
             models.Index(fields=["is_verified"]),
         ]  # ← FIXED: Added closing bracket
+        constraints = [
+            # Backs the (title, source_url) upsert key used by the ingest command.
+            models.UniqueConstraint(
+                name="uniq_title_sourceurl",
+                fields=["title", "source_url"],
+            )
+        ]
+
+class StoryCluster(models.Model):
+    """A story across runs: every source that ever reported it counts towards consensus."""
+    key = models.CharField(max_length=16, unique=True)  # Article.story_key
+    signature = models.BinaryField()  # MinHash of the first headline, feeds the LSH index
+    source_count = models.IntegerField(default=0)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.source_count} sources)"
+
+
+class StoryClusterSource(models.Model):
+    cluster = models.ForeignKey(StoryCluster, on_delete=models.CASCADE, related_name='sources')
+    source_name = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["cluster", "source_name"], name="uniq_cluster_source"),
+        ]
+
+    def __str__(self):
+        return f"{self.source_name} → {self.cluster.key}"
+
 
 class UserSubscription(models.Model):  # ← Now properly outside Meta
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -43,16 +80,81 @@ class Feedback(models.Model):
         return f"Feedback for {self.article.title} by {self.user.username if self.user else 'Anonymous'}"
     
 
-class Meta:
-    indexes = [
-        models.Index(fields=["-publication_date"]),
-        models.Index(fields=["-verified_at"]),
-        models.Index(fields=["is_verified"]),
-    ]
-    constraints = [
-        models.UniqueConstraint(
-            name="uniq_title_sourceurl",
-            fields=["title", "source_url"],
-        )
-    ]
+class Feed(models.Model):
+    """
+    An RSS/Atom feed the ingest command polls: its schedule, health, and the
+    HTTP validators from the last download (for conditional GETs).
+    """
+    url = models.URLField(max_length=500, unique=True)
+    name = models.CharField(max_length=100, blank=True, default='')
+    category = models.CharField(max_length=100, default='News Showcase')
+    is_active = models.BooleanField(default=True)
+    # Scheduling
+    poll_interval = models.DurationField(default=timedelta(hours=1))
+    next_poll_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    error_streak = models.IntegerField(default=0)
+    last_error = models.CharField(max_length=255, blank=True, default='')
+    avg_items = models.FloatField(default=0)  # moving average of new entries per poll
+    # Conditional GET state
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    last_status = models.IntegerField(null=True, blank=True)
+    checked_at = models.DateTimeField(null=True, blank=True)
+    changed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name or self.url
+
+
+class ScrapedImage(models.Model):
+    """Image found on an article page, keyed by norm_url(link). Empty image_url is a remembered miss."""
+    url_key = models.CharField(max_length=500, unique=True)
+    image_url = models.URLField(max_length=500, blank=True, default='')
+    checked_at = models.DateTimeField()
 
+    def __str__(self):
+        return self.url_key
+
+
+
+class IngestLock(models.Model):
+    """
+    Single-flight lock for a job, shared by every process that can start it
+    (web tier, cron, daemon). Held while locked_until is in the future; an
+    expired lock is treated as free so a crashed holder cannot wedge the job.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    owner = models.CharField(max_length=100, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_triggered_at = models.DateTimeField(null=True, blank=True)  # last homepage-triggered run
+    # Bumped after every change to the articles; versions the feed page cache
+    # (see news_feed/pagecache.py).
+    generation = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+
+class IngestRun(models.Model):
+    """One fetch_and_verify_news run and its JSON report (see news_feed.runstats)."""
+    STATUS_CHOICES = [('ok', 'OK'), ('failed', 'Failed')]
+
+    started_at = models.DateTimeField(db_index=True)
+    finished_at = models.DateTimeField()
+    seconds = models.FloatField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ok')
+    error = models.CharField(max_length=255, blank=True, default='')
+    feeds_polled = models.IntegerField(default=0)
+    articles_saved = models.IntegerField(default=0)
+    articles_updated = models.IntegerField(default=0)
+    report = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M} {self.status} ({self.seconds:.1f}s)"
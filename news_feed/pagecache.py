@@ -0,0 +1,95 @@
+# news_feed/pagecache.py
+"""
+Rendered feed pages for anonymous readers.
+
+A feed page only changes when articles do, so cached_feed_page keeps the
+rendered response in Django's cache under the page's path and query and the
+current feed generation: a counter on the ingest's IngestLock row that
+bump_generation() raises after every article write (ingest run, API post).
+Old entries are never deleted, they simply stop being asked for and expire.
+
+Every process re-reads the generation at most every GENERATION_CHECK_EVERY
+seconds, so a cache hit normally costs no query at all and an ingest in
+another process shows up on the web tier within that delay.
+
+Pages are the same for every anonymous reader, so they carry no CSRF token
+of their own: the wrapper makes sure the csrftoken cookie is set and the
+page's script sends that instead.
+"""
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from news_feed.locks import INGEST
+from news_feed.models import IngestLock
+
+PAGE_CACHE_TTL = 3 * 60 * 60     # seconds; longer than the gap between two ingests
+GENERATION_CHECK_EVERY = 30      # seconds between this process's reads of the generation
+PERSONAL_PARAMS = {"lat", "lon"}  # only the weather widget and Local use them
+
+_generation = None
+_next_check = 0.0
+
+
+def generation() -> int:
+    global _generation, _next_check
+    now = time.monotonic()
+    if _generation is None or now >= _next_check:
+        _generation = IngestLock.objects.filter(name=INGEST).values_list("generation", flat=True).first() or 0
+        _next_check = now + GENERATION_CHECK_EVERY
+    return _generation
+
+
+def bump_generation():
+    """Retire every cached feed page. Call once the article writes have committed."""
+    global _generation
+    if not IngestLock.objects.filter(name=INGEST).update(generation=F("generation") + 1):
+        try:
+            with transaction.atomic():
+                IngestLock.objects.create(name=INGEST, generation=1)
+        except IntegrityError:   # created by a concurrent caller
+            IngestLock.objects.filter(name=INGEST).update(generation=F("generation") + 1)
+    _generation = None   # this process sees its own bump at once
+
+
+def bump_generation_on_commit():
+    transaction.on_commit(bump_generation)
+
+
+def page_key(request) -> str:
+    params = sorted((k, v) for k, v in request.GET.items() if k not in PERSONAL_PARAMS)
+    return f"feedpage:{generation()}:{request.path}?{urlencode(params)}"
+
+
+def cached_feed_page(view=None, *, unless=None):
+    """
+    Serve anonymous GETs of `view` from the page cache. `unless(request,
+    *args, **kwargs)` marks requests that must always be rendered (e.g. Local,
+    which depends on the reader's location).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (not getattr(settings, "FEED_PAGE_CACHE", True)
+                    or request.method != "GET" or request.user.is_authenticated
+                    or (unless and unless(request, *args, **kwargs))):
+                return view(request, *args, **kwargs)
+            get_token(request)   # the csrftoken cookie the page's forms send
+            key = page_key(request)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response["Content-Type"]), PAGE_CACHE_TTL)
+            return response
+        return wrapper
+    return decorator(view) if view else decorator
@@ -0,0 +1,60 @@
+# news_feed/pagination.py
+"""
+Keyset (cursor) pagination for article feeds.
+
+A page is "the next PAGE_SIZE rows after (publication_date, id)" in
+newest-first order, so every page is one index range scan of the same
+size: page 500 costs what page 1 costs, unlike OFFSET, which has to walk
+over every row it skips. The cursor is the opaque, URL-safe encoding of
+the last row on the previous page; rows that arrive meanwhile never shift
+what the next page shows.
+
+Rows without a publication_date have no place in the order; callers
+exclude them.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+PAGE_SIZE = 30   # cards per page, first page and every scroll alike
+ORDERING = ("-publication_date", "-id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(article) -> str:
+    raw = f"{article.publication_date.isoformat()}|{article.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """(publication_date, id) from a cursor made by encode_cursor(); InvalidCursor otherwise."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        published, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(published), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Bad page cursor: {cursor!r}") from e
+
+
+def keyset_page(queryset, cursor=None, page_size: int = PAGE_SIZE):
+    """
+    One page of `queryset` in ORDERING, starting after `cursor`.
+    Returns (articles, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by(*ORDERING)
+    if cursor:
+        published, pk = decode_cursor(cursor)
+        # The leading <= gives the database a range to seek to; the OR only
+        # breaks ties between rows published in the same instant.
+        queryset = queryset.filter(publication_date__lte=published).filter(
+            Q(publication_date__lt=published) | Q(id__lt=pk)
+        )
+    rows = list(queryset[:page_size + 1])   # one extra row says whether a next page exists
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
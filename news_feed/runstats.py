@@ -0,0 +1,75 @@
+# news_feed/runstats.py
+"""
+Instrumentation for one ingest run.
+
+RunStats is a Counter (pipeline stages bump counts on it, e.g.
+stats["parsed"] += 1) that also keeps stage timers, latency samples and
+one row per polled feed. report() turns it all into a JSON-ready dict,
+which the command prints or writes to a file and stores on IngestRun.
+"""
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 4)
+
+
+class RunStats(Counter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = defaultdict(float)   # stage -> seconds spent in it
+        self.samples = defaultdict(list)    # name -> individual latencies
+        self.feeds = []
+        self.started_at = timezone.now()
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Add the time spent in the block to `stage`. Keep yields of a generator outside it."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] += time.perf_counter() - start
+
+    def add_feed(self, result, status: str):
+        self.feeds.append({
+            "url": result.url,
+            "status": status,
+            "seconds": round(result.elapsed, 3),
+            "bytes": result.bytes,
+            "parse_seconds": round(result.parse_seconds, 3),
+            "entries": len(result.feed.entries),
+            "error": result.error,
+        })
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def report(self) -> dict:
+        latencies = self.samples["image_scrape"]
+        return {
+            "started_at": self.started_at.isoformat(),
+            "seconds": round(self.elapsed, 3),
+            "counts": dict(self),
+            "stages": {stage: round(seconds, 3) for stage, seconds in self.timings.items()},
+            "images": {
+                "cache_hits": self["images_cached"],
+                "scraped": self["images_scraped"],
+                "found": self["images_found"],
+                "missed": self["images_scraped"] - self["images_found"],
+                "latency_p50": _percentile(latencies, 0.5),
+                "latency_p95": _percentile(latencies, 0.95),
+                "latency_max": _percentile(latencies, 1.0),
+            },
+            # slowest first: the feeds that dominate the run
+            "feeds": sorted(self.feeds, key=lambda f: f["seconds"], reverse=True),
+        }
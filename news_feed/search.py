@@ -0,0 +1,159 @@
+# news_feed/search.py
+"""
+Full-text article search.
+
+On SQLite, search_articles() queries the FTS5 index created by migration
+0017 (porter-stemmed, with prefix indexes), ranks with BM25 weighting title
+hits over summary hits, and asks FTS5 for a highlighted snippet. On
+PostgreSQL the same migration adds a weighted, generated tsvector column
+with a GIN index; ranking is ts_rank_cd and snippets come from ts_headline.
+Either way a search is one indexed query whose cost follows the number of
+matches, not the size of the archive. Other databases fall back to a
+LIKE scan.
+
+Every term of the query is matched as a prefix ("elect" finds "election")
+and all terms must match.
+
+With SEARCH_BACKEND = "inverted_index" matching and ranking move into the
+process instead (news_feed/invindex.py) and the database only loads the
+winning rows by primary key. index_articles() keeps that index current;
+for the database backend it has nothing to do, the triggers do it. On
+platforms without fcntl (Windows) the setting is refused with a system
+check warning and the database backend is used.
+"""
+import re
+
+from django.conf import settings
+from django.core import checks
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from news_feed import invindex
+from news_feed.models import Article
+
+SEARCH_LIMIT = 60      # results per search, best first
+MAX_TERMS = 8          # longer queries are cut here
+SNIPPET_TOKENS = 24    # words of context around the hits
+TITLE_WEIGHT = 8.0     # a title hit counts this many summary hits (SQLite BM25)
+
+# Highlight markers: control characters cannot occur in feed text, so the
+# snippet can be HTML-escaped first and the markers swapped for <mark> after.
+_START, _END = "\x02", "\x03"
+_TERM = re.compile(r"\w+")
+
+SQLITE_SEARCH = f"""
+    SELECT a.*, snippet(news_feed_article_fts, -1, char(2), char(3), '…', {SNIPPET_TOKENS}) AS snippet
+    FROM news_feed_article_fts
+    JOIN news_feed_article a ON a.id = news_feed_article_fts.rowid
+    WHERE news_feed_article_fts MATCH %s AND a.is_verified
+    ORDER BY bm25(news_feed_article_fts, {TITLE_WEIGHT}, 1.0)
+    LIMIT %s
+"""
+POSTGRES_SEARCH = f"""
+    SELECT a.*, ts_headline('english', a.summary, q,
+                            'StartSel=' || chr(2) || ', StopSel=' || chr(3) ||
+                            ', MaxWords={SNIPPET_TOKENS}, MinWords=8') AS snippet
+    FROM news_feed_article a, to_tsquery('english', %s) q
+    WHERE a.search_vector @@ q AND a.is_verified
+    ORDER BY ts_rank_cd(a.search_vector, q) DESC
+    LIMIT %s
+"""
+
+
+def query_terms(text: str):
+    return _TERM.findall((text or "").lower())[:MAX_TERMS]
+
+
+def highlight(snippet: str):
+    """Escape a marked-up snippet and turn the markers into <mark> tags."""
+    html = escape(snippet or "").replace(_START, "<mark>").replace(_END, "</mark>")
+    return mark_safe(html)
+
+
+def _like_search(terms, limit):
+    qs = Article.objects.filter(is_verified=True)
+    for term in terms:
+        qs = qs.filter(Q(title__icontains=term) | Q(summary__icontains=term))
+    articles = list(qs.order_by("-publication_date")[:limit])
+    for a in articles:
+        a.snippet = a.summary[:200]
+    return articles
+
+
+def _wants_inverted_index() -> bool:
+    return getattr(settings, "SEARCH_BACKEND", "database") == "inverted_index"
+
+
+def uses_inverted_index() -> bool:
+    return _wants_inverted_index() and invindex.SUPPORTED
+
+
+@checks.register(checks.Tags.compatibility)
+def check_search_backend(app_configs=None, **kwargs):
+    if _wants_inverted_index() and not invindex.SUPPORTED:
+        return [checks.Warning(
+            "SEARCH_BACKEND = 'inverted_index' needs fcntl file locks, which this platform lacks.",
+            hint="Search uses the database's full-text index instead; set SEARCH_BACKEND = 'database'.",
+            id="news_feed.W001",
+        )]
+    return []
+
+
+def index_articles(queryset=None, removed=()):
+    """Report written (queryset) and deleted (ids) articles to the inverted index, when it is in use."""
+    if uses_inverted_index():
+        invindex.update_index(queryset, removed)
+
+
+def index_articles_on_commit(ids):
+    """
+    index_articles() for the articles with these ids, once the current
+    transaction commits. Every update rewrites the index file, so callers
+    collect the ids of a request's writes and call this once.
+    """
+    ids = list(ids)
+    if ids and uses_inverted_index():
+        transaction.on_commit(lambda: index_articles(Article.objects.filter(pk__in=ids)))
+
+
+def _mark_terms(summary: str, terms) -> str:
+    """A window of the summary around its first match, matched words between the markers."""
+    words = (summary or "").split()
+    hit = [any(t.startswith(term) for t in invindex.tokens(w) for term in terms) for w in words]
+    start = max(0, hit.index(True) - SNIPPET_TOKENS // 3) if any(hit) else 0
+    window = range(start, min(len(words), start + SNIPPET_TOKENS))
+    text = " ".join(f"{_START}{words[i]}{_END}" if hit[i] else words[i] for i in window)
+    return ("…" if start else "") + text + ("…" if window.stop < len(words) else "")
+
+
+def _index_search(text, limit):
+    hits = invindex.current_index().search(text, limit)
+    found = Article.objects.in_bulk([pk for pk, _ in hits])
+    articles = [found[pk] for pk, _ in hits if pk in found]
+    terms = invindex.tokens(text)
+    for a in articles:
+        a.snippet = _mark_terms(a.summary, terms)
+    return articles
+
+
+def search_articles(text: str, limit: int = SEARCH_LIMIT):
+    """
+    Verified articles matching `text`, best match first. Each carries a
+    .snippet: safe HTML with the matched words wrapped in <mark>.
+    """
+    terms = query_terms(text)
+    if not terms:
+        return []
+    if uses_inverted_index():
+        articles = _index_search(text, limit)
+    elif connection.vendor == "sqlite":
+        articles = list(Article.objects.raw(SQLITE_SEARCH, [" ".join(f'"{t}"*' for t in terms), limit]))
+    elif connection.vendor == "postgresql":
+        articles = list(Article.objects.raw(POSTGRES_SEARCH, [" & ".join(f"{t}:*" for t in terms), limit]))
+    else:
+        articles = _like_search(terms, limit)
+    for a in articles:
+        a.snippet = highlight(a.snippet)
+    return articles
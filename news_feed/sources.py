@@ -0,0 +1,96 @@
+# news_feed/sources.py
+"""
+Registry of known news sources, loaded once from data/sources.json.
+
+Domains are stored in a trie keyed by reversed host labels
+(com -> reuters -> feeds), so one walk over a URL's host finds the most
+specific entry, subdomains included. An entry can carry path-prefix rules
+that override its category, e.g. reuters.com/business -> Business.
+"""
+import json
+from collections import namedtuple
+from pathlib import Path
+from urllib.parse import urlsplit
+
+DATA_FILE = Path(__file__).resolve().parent / "data" / "sources.json"
+
+SourceInfo = namedtuple("SourceInfo", ["domain", "category", "reputation", "is_top"])
+
+
+class _Node:
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children = {}
+        self.entry = None
+
+
+class SourceRegistry:
+    def __init__(self, sources, default_reputation: int = 60):
+        self.default_reputation = default_reputation
+        self.root = _Node()
+        self.top_names = set()
+        for entry in sources:
+            entry = dict(entry)
+            # longest prefix first, so /news/world beats /news
+            entry["paths"] = sorted((entry.get("paths") or {}).items(),
+                                    key=lambda item: len(item[0]), reverse=True)
+            node = self.root
+            for label in reversed(entry["domain"].lower().split(".")):
+                node = node.children.setdefault(label, _Node())
+            node.entry = entry
+            if entry.get("top"):
+                self.top_names.update(entry.get("names", []))
+
+    @classmethod
+    def from_file(cls, path=DATA_FILE):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["sources"], data.get("default_reputation", 60))
+
+    def _entries(self, host: str):
+        """Entries matching a host, most specific first."""
+        node, found = self.root, []
+        for label in reversed(host.split(".")):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if node.entry is not None:
+                found.append(node.entry)
+        return found[::-1]
+
+    def lookup(self, url: str) -> SourceInfo:
+        """Category, reputation and top-source flag for a URL or bare host."""
+        url = (url or "").strip().lower()
+        parts = urlsplit(url if "://" in url else "//" + url)
+        host = (parts.hostname or "").removeprefix("www.")
+        path = parts.path or "/"
+
+        domain = category = reputation = is_top = None
+        for entry in self._entries(host):
+            domain = domain or entry["domain"]
+            if category is None:
+                category = next((cat for prefix, cat in entry["paths"] if path.startswith(prefix)),
+                                entry.get("category"))
+            if reputation is None:
+                reputation = entry.get("reputation")
+            if is_top is None:
+                is_top = entry.get("top")
+        return SourceInfo(
+            domain,
+            category,
+            self.default_reputation if reputation is None else reputation,
+            bool(is_top),
+        )
+
+    def category(self, url: str):
+        return self.lookup(url).category
+
+    def reputation(self, url: str) -> int:
+        return self.lookup(url).reputation
+
+    def is_top(self, url: str) -> bool:
+        return self.lookup(url).is_top
+
+
+SOURCES = SourceRegistry.from_file()
@@ -34,3 +34,32 @@ def send_news_alert_task(article_id):
         except Exception as e:
             print(f"Error sending email: {e}")
 
+
+
+def send_news_digest_task(article_ids):
+    """One email listing every article of an ingest batch, instead of one per article."""
+    articles = list(Article.objects.filter(pk__in=article_ids, is_verified=True)
+                    .order_by('-credibility_score'))
+    if not articles:
+        return
+
+    subject = f"{len(articles)} New Verified News Stories"
+    subscribed_users = UserSubscription.objects.filter(is_subscribed=True).select_related('user')
+    recipient_list = [sub.user.email for sub in subscribed_users]
+
+    if recipient_list:
+        html_message = render_to_string('news_feed/email/news_digest.html', {'articles': articles})
+        plain_message = "\n".join(f"{a.title}: {a.source_url}" for a in articles)
+
+        try:
+            send_mail(
+                subject,
+                plain_message,
+                settings.EMAIL_HOST_USER,
+                recipient_list,
+                html_message=html_message,
+                fail_silently=False,
+            )
+            print(f"Sent news digest of {len(articles)} articles to {len(recipient_list)} users.")
+        except Exception as e:
+            print(f"Error sending email: {e}")
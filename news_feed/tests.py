@@ -1,3 +1,860 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from news_feed import bench, categories, clustering, invindex, keywords, locks, pagecache, pagination, search, weather
+from news_feed.bench.views import over_budget, run_view_benchmark, seed_articles
+from news_feed.sources import SOURCES
+from news_feed.management.commands import fetch_and_verify_news as ingest
+from news_feed.models import Article, Feed, IngestLock, IngestRun, ScrapedImage, StoryCluster
+from news_feed.runstats import RunStats
+
+RSS = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>Stub</title>
+<item><title>Hello</title><link>https://example.com/a</link></item>
+</channel></rss>"""
+
+
+class StubResponse:
+    def __init__(self, content=b"", status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ValueError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            self.read = i + chunk_size
+            yield self.content[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def fetch(urls, **kwargs):
+    """iter_feeds() results in input order, one per unique url."""
+    by_url = {r.url: r for r in ingest.iter_feeds(urls, **kwargs)}
+    return [by_url[u] for u in dict.fromkeys(urls)]
+
+
+def record(feeds, results):
+    """Store each poll's outcome the way the command does."""
+    by_url = {f.url: f for f in feeds}
+    ingest.save_feeds([ingest.apply_feed_result(by_url[r.url], r, timezone.now()) for r in results])
+
+
+class FetchFeedsTests(SimpleTestCase):
+    def test_results_keep_input_order_and_never_raise(self):
+        def get(url, **kwargs):
+            if "broken" in url:
+                raise ConnectionError("boom")
+            return StubResponse(RSS)
+
+        urls = ["https://a.example/rss", "https://broken.example/rss", "https://a.example/rss"]
+        with mock.patch.object(ingest.SESSION, "get", side_effect=get):
+            results = fetch(urls)
+
+        self.assertEqual([r.url for r in results], urls[:2])
+        self.assertEqual(len(results[0].feed.entries), 1)
+        self.assertIsNone(results[0].error)
+        self.assertEqual(results[1].feed.entries, [])
+        self.assertIn("boom", results[1].error)
+
+    def test_deadline_drops_slow_feeds(self):
+        def get(url, **kwargs):
+            if "slow" in url:
+                time.sleep(1)
+            return StubResponse(RSS)
+
+        with mock.patch.object(ingest.SESSION, "get", side_effect=get):
+            results = fetch(["https://slow.example/rss", "https://fast.example/rss"],
+                                         deadline=0.3)
+
+        self.assertEqual(results[0].error, "deadline exceeded")
+        self.assertIsNone(results[1].error)
+
+    def test_feeds_never_requested_by_the_deadline_keep_their_schedule(self):
+        def get(url, **kwargs):
+            time.sleep(0.5)
+            return StubResponse(RSS)
+
+        urls = ["https://a.example/1", "https://a.example/2",   # the second waits for a's host slot
+                "https://b.example/1", "https://c.example/1",   # queued behind both workers
+                "https://d.example/1"]                          # outside the first window
+        with mock.patch.object(ingest.SESSION, "get", side_effect=get):
+            # the run started a while ago
+            results = fetch(urls, workers=2, per_host=1, deadline=0.2,
+                                         started=time.perf_counter() - 0.1)
+
+        self.assertEqual((results[0].attempted, results[0].error), (True, "deadline exceeded"))
+        self.assertEqual([(r.attempted, r.error) for r in results[1:]], [(False, None)] * 4)
+
+        feed = Feed(url=urls[3], error_streak=1, next_poll_at=None)
+        ingest.apply_feed_result(feed, results[3], timezone.now())
+        self.assertEqual((feed.error_streak, feed.next_poll_at, feed.checked_at), (1, None, None))
+
+
+class ScrapeImageTests(SimpleTestCase):
+    def scrape(self, html, **kwargs):
+        response = StubResponse(html.encode(), headers={"Content-Type": "text/html"})
+        with mock.patch.object(ingest.SESSION, "get", return_value=response):
+            return ingest.scrape_image_from_page("https://a.example/news/1", **kwargs), response
+
+    def test_stops_reading_after_head_with_meta_image(self):
+        html = ('<html><head><meta name="twitter:image" content="/tw.jpg">'
+                '<meta property="og:image" content="/og.jpg"></head><body>'
+                + "x" * 200_000 + "</body></html>")
+        image, response = self.scrape(html)
+        self.assertEqual(image, "https://a.example/og.jpg")
+        self.assertLessEqual(response.read, ingest.IMAGE_SCRAPE_CHUNK)
+
+    def test_falls_back_to_body_img_within_byte_cap(self):
+        html = ('<html><head><title>t</title></head><body><article>'
+                '<img src="/big.jpg" width="800" height="400"></article>'
+                + "x" * 100_000 + '<img src="/late.jpg" width="900" height="900"></body></html>')
+        image, response = self.scrape(html, max_bytes=1024, parser="html.parser")
+        self.assertEqual(image, "https://a.example/big.jpg")
+
+    def test_missing_parser_is_refused_before_the_run(self):
+        with mock.patch.object(ingest.builder_registry, "lookup", return_value=None), \
+                mock.patch.object(ingest.Command, "run") as run:
+            with self.assertRaises(CommandError):
+                call_command("fetch_and_verify_news", html_parser="lxml", stdout=StringIO())
+        run.assert_not_called()
+
+
+class ConditionalFetchTests(TestCase):
+    url = "https://a.example/rss"
+
+    def test_validators_are_sent_and_unchanged_feeds_skip_parsing(self):
+        Feed.objects.create(url=self.url)
+        calls = []
+
+        def get(url, headers=None, **kwargs):
+            calls.append(headers)
+            if headers.get("If-None-Match") == '"v1"' and len(calls) == 2:
+                return StubResponse(status_code=304)
+            return StubResponse(RSS, headers={"ETag": '"v1"'})
+
+        with mock.patch.object(ingest.SESSION, "get", side_effect=get):
+            for _ in range(3):
+                feeds = ingest.due_feeds(include_all=True)
+                results = fetch([self.url], states={f.url: f for f in feeds})
+                record(feeds, results)
+
+        self.assertEqual(calls[0], {})
+        self.assertEqual(calls[1]["If-None-Match"], '"v1"')
+        # second run: 304, third run: 200 with identical bytes
+        self.assertTrue(results[0].not_modified)
+        self.assertEqual(results[0].feed.entries, [])
+        feed = Feed.objects.get(url=self.url)
+        self.assertEqual(feed.etag, '"v1"')
+        self.assertEqual(feed.last_status, 200)
+        self.assertEqual(feed.name, "Stub")
+
+
+class FeedScheduleTests(TestCase):
+    def test_only_due_feeds_are_polled_and_failures_back_off(self):
+        Feed.objects.all().delete()  # drop the feeds seeded by the migration
+        now = ingest.timezone.now()
+        ok = Feed.objects.create(url="https://ok.example/rss")
+        bad = Feed.objects.create(url="https://bad.example/rss", error_streak=2)
+        Feed.objects.create(url="https://later.example/rss", next_poll_at=now + ingest.timedelta(hours=1))
+        Feed.objects.create(url="https://off.example/rss", is_active=False)
+
+        feeds = ingest.due_feeds()
+        self.assertEqual([f.url for f in feeds], [ok.url, bad.url])
+
+        def get(url, **kwargs):
+            if "bad" in url:
+                raise ConnectionError("down")
+            return StubResponse(RSS)
+
+        with mock.patch.object(ingest.SESSION, "get", side_effect=get):
+            record(feeds, fetch([f.url for f in feeds]))
+
+        ok.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(ok.error_streak, 0)
+        self.assertAlmostEqual(ok.avg_items, ingest.FEED_YIELD_SMOOTHING)
+        self.assertAlmostEqual((ok.next_poll_at - ok.checked_at).total_seconds(), 3600, delta=1)
+        self.assertEqual(bad.error_streak, 3)
+        self.assertAlmostEqual((bad.next_poll_at - bad.checked_at).total_seconds(), 8 * 3600, delta=1)
+        self.assertEqual(ingest.due_feeds(), [])
+
+
+class ResolveImagesTests(TestCase):
+    def test_hits_and_misses_are_remembered(self):
+        articles = [
+            {"source_url": "https://a.example/story?utm=1", "image_url": ""},
+            {"source_url": "https://a.example/other", "image_url": ""},
+            {"source_url": "https://a.example/feed-image", "image_url": "https://img/x.jpg"},
+        ]
+        pages = {"https://a.example/story?utm=1": "https://img/story.jpg"}
+        with mock.patch.object(ingest, "scrape_image_from_page", side_effect=pages.get) as scrape:
+            self.assertEqual(ingest.resolve_images(articles), (0, 2))
+            again = [{"source_url": "https://a.example/story", "image_url": ""},
+                     {"source_url": "https://a.example/other", "image_url": ""}]
+            self.assertEqual(ingest.resolve_images(again), (2, 0))
+        self.assertEqual(scrape.call_count, 2)
+        self.assertEqual(articles[0]["image_url"], "https://img/story.jpg")
+        self.assertEqual(again[0]["image_url"], "https://img/story.jpg")
+        self.assertEqual(again[1]["image_url"], "")
+        self.assertEqual(ScrapedImage.objects.filter(image_url="").count(), 1)
+
+    def test_expired_misses_are_scraped_again(self):
+        ScrapedImage.objects.create(url_key="https://a.example/other", image_url="",
+                                    checked_at=ingest.timezone.now() - ingest.IMAGE_MISS_TTL * 2)
+        with mock.patch.object(ingest, "scrape_image_from_page", return_value=None) as scrape:
+            ingest.resolve_images([{"source_url": "https://a.example/other", "image_url": ""}])
+        scrape.assert_called_once_with("https://a.example/other")
+
+
+class PersistArticlesTests(TestCase):
+    def article(self, title, url, **extra):
+        return {"title": title, "source_url": url, "summary": "s", "category": "World",
+                "publication_date": ingest.timezone.now(), "source_name": "Src",
+                "credibility_score": 50, **extra}
+
+    def test_creates_then_updates_with_one_digest_per_batch(self):
+        with mock.patch.object(ingest, "send_news_digest_task") as digest:
+            with self.captureOnCommitCallbacks(execute=True):
+                counts = ingest.persist_articles([self.article("A", "https://x.example/a/"),
+                                                  self.article("B", "https://x.example/b")])
+            self.assertEqual(counts, (2, 0))
+            digest.assert_called_once()
+            self.assertEqual(len(digest.call_args.args[0]), 2)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                counts = ingest.persist_articles([self.article("A", "https://x.example/a?ref=rss",
+                                                               credibility_score=77)])
+            self.assertEqual(counts, (0, 1))
+            self.assertEqual(digest.call_count, 1)
+
+        self.assertEqual(Article.objects.count(), 2)
+        self.assertEqual(Article.objects.get(title="A").credibility_score, 77)
+
+
+class StoryIndexTests(SimpleTestCase):
+    def test_paraphrased_headlines_share_a_story(self):
+        index = clustering.StoryIndex()
+        first, _ = index.assign("India beats Australia in World Cup final")
+        second, _ = index.assign("India defeats Australia to win World Cup final")
+        other, _ = index.assign("Sensex falls 500 points as markets slump")
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(index.assign("!!!"), ("", None))
+
+    def test_index_rebuilds_from_stored_signatures(self):
+        key, signature = clustering.StoryIndex().assign("NASA launches new moon rocket")
+        index = clustering.StoryIndex.from_rows([(key, signature.tobytes())])
+        self.assertEqual(index.assign("NASA launches moon rocket")[0], key)
+
+
+class StoryClusterTests(TestCase):
+    def group(self, title, *sources):
+        key, signature = ingest.load_story_index().assign(title)
+        return key, [{"source_name": name, "minhash": signature.tobytes()} for name in sources]
+
+    def test_consensus_accumulates_across_runs(self):
+        key, group = self.group("India beats Australia in World Cup final", "NDTV", "NDTV")
+        self.assertEqual(ingest.update_story_clusters({key: group}), {key: (1, ["NDTV"])})
+
+        again, group = self.group("India defeats Australia to win World Cup final", "BBC", "NDTV")
+        self.assertEqual(again, key)
+        self.assertEqual(ingest.update_story_clusters({key: group}), {key: (2, ["BBC", "NDTV"])})
+        self.assertEqual(StoryCluster.objects.get(key=key).source_count, 2)
+
+
+class ScoreArticlesTests(SimpleTestCase):
+    articles = [
+        {"source_url": "https://www.reuters.com/world/x", "title": "Confirmed: official statement", "image_url": ""},
+        {"source_url": "https://blog.example/y", "title": "Rumor could be true", "image_url": "https://x/manipulated_image.jpg"},
+        {"source_url": "https://www.reuters.com/world/z", "title": "Plain headline", "image_url": "https://x/a.jpg"},
+    ]
+
+    def test_same_seed_gives_same_scores(self):
+        first, _ = ingest.score_articles(self.articles, [3, 1, 2], seed=7)
+        second, _ = ingest.score_articles(self.articles, [3, 1, 2], seed=7)
+        self.assertEqual(first.tolist(), second.tolist())
+
+    def test_components_match_single_article_rules(self):
+        scores, images = ingest.score_articles(self.articles, [3, 1, 2], seed=7)
+        self.assertEqual(images[:2].tolist(), [50, 10])
+        self.assertTrue(40 <= images[2] <= 80)
+        # reuters 98*0.4 + 25 + 50*0.25 + 10*0.5 = 81.7, plus 1-5 noise
+        self.assertTrue(82 <= scores[0] <= 86)
+        # 60*0.4 + 25/3 + 10*0.25 - 10*0.5 = 29.8 + noise, clamped to the display minimum
+        self.assertTrue(ingest.MIN_SCORE_FOR_DISPLAY <= scores[1] <= 34)
+        self.assertEqual(ingest.score_articles([], []) [0].tolist(), [])
+
+
+class KeywordClassifyTests(SimpleTestCase):
+    def test_category_priority_and_score_in_one_pass(self):
+        self.assertEqual(keywords.classify("EXCLUSIVE: India wins World Cup, confirmed"),
+                         keywords.Headline("Sports", 10))
+        self.assertEqual(keywords.classify("Opinion: budget could be delayed").category, "Business")
+        self.assertEqual(keywords.classify("Opinion: budget could be delayed").score_adjustment, -10)
+        self.assertEqual(keywords.classify("Vaccines rolled out in hospitals").category, "Health")
+
+    def test_keywords_match_whole_words_only(self):
+        # "ai" inside "said" and "us" inside "business" used to match
+        self.assertEqual(keywords.classify("Minister said the plan is ready").category,
+                         keywords.DEFAULT_CATEGORY)
+        self.assertEqual(keywords.classify("Delhi business owners protest").category, "India")
+
+    def test_a_longer_phrase_does_not_hide_a_higher_priority_keyword(self):
+        # "researchers discover" (a late Science rule) contains "researchers" (ranked above Technology)
+        self.assertEqual(keywords.classify("Researchers discover new AI chip").category, "Science")
+        self.assertEqual(keywords.classify("World Cup final").category, "Sports")
+
+
+class SourceRegistryTests(SimpleTestCase):
+    def test_path_rules_and_subdomains(self):
+        self.assertEqual(SOURCES.lookup("https://www.reuters.com/business/x"),
+                         ("reuters.com", "Business", 98, True))
+        self.assertEqual(SOURCES.category("https://www.reuters.com/world/y"), "World")
+        self.assertEqual(SOURCES.category("https://sports.ndtv.com/cricket/z"), "India")
+        self.assertEqual(SOURCES.category("https://timesofindia.indiatimes.com/india/a"), "India")
+        self.assertIsNone(SOURCES.category("https://timesofindia.indiatimes.com/world/a"))
+        self.assertEqual(SOURCES.reputation("feeds.bbc.co.uk"), 92)
+
+    def test_unknown_hosts_only_match_on_label_boundaries(self):
+        self.assertEqual(SOURCES.lookup("https://notbbc.com/news"), (None, None, 60, False))
+        self.assertIn("The Hindu", SOURCES.top_names)
+
+
+class IngestDaemonTests(TestCase):
+    def test_once_runs_in_process_and_reports_health(self):
+        Feed.objects.all().delete()
+        Feed.objects.create(url="https://a.example/rss")
+        health = os.path.join(tempfile.mkdtemp(), "health.json")
+
+        with mock.patch.object(ingest.SESSION, "get", return_value=StubResponse(RSS)) as get:
+            call_command("run_ingest_daemon", once=True, health_file=health, stdout=StringIO())
+
+        self.assertEqual(get.call_args_list[0].args, ("https://a.example/rss",))
+        with open(health) as f:
+            status = json.load(f)
+        self.assertEqual(status["state"], "stopped")
+        self.assertEqual((status["runs"], status["failures"]), (1, 0))
+        with self.assertRaises(CommandError):
+            call_command("run_ingest_daemon", check=True, health_file=health, stdout=StringIO())
+
+
+class IngestLockTests(TestCase):
+    def test_lock_is_single_flight_and_expires(self):
+        owner = locks.acquire()
+        self.assertIsNotNone(owner)
+        self.assertIsNone(locks.acquire())
+
+        out = StringIO()
+        with mock.patch.object(ingest.Command, "run") as run:
+            call_command("fetch_and_verify_news", stdout=out)
+        run.assert_not_called()
+        self.assertIn("in progress", out.getvalue())
+
+        IngestLock.objects.filter(name=locks.INGEST).update(
+            locked_until=ingest.timezone.now() - ingest.timedelta(seconds=1))
+        self.assertIsNotNone(locks.acquire())   # the dead holder's lock is reclaimed
+        locks.release(owner)                     # and its late release changes nothing
+        self.assertIsNotNone(IngestLock.objects.get(name=locks.INGEST).locked_until)
+
+    def test_saved_batches_renew_the_lease(self):
+        with locks.single_flight(ttl=ingest.timedelta(seconds=1)) as owner:
+            command = ingest.Command()
+            command.lock_owner = owner
+            ingest.persist([{"title": "Renewed", "source_url": "https://x.test/r",
+                             "publication_date": timezone.now()}], RunStats(), heartbeat=command.renew_lock)
+            lock = IngestLock.objects.get(name=locks.INGEST)
+            self.assertGreater(lock.locked_until, timezone.now() + ingest.timedelta(minutes=20))
+            self.assertIsNone(locks.acquire())
+        self.assertFalse(locks.renew(owner))   # released: the token no longer holds it
+
+    def test_homepage_trigger_is_claimed_once_per_interval(self):
+        interval = ingest.timedelta(minutes=30)
+        self.assertTrue(locks.claim_trigger(interval))
+        self.assertFalse(locks.claim_trigger(interval))
+
+        IngestLock.objects.update(last_triggered_at=None)
+        with locks.single_flight() as held:
+            self.assertTrue(held)
+            self.assertFalse(locks.claim_trigger(interval))  # a run is in progress
+        self.assertFalse(locks.claim_trigger(interval))      # and one just finished
+
+
+class PipelineTests(TestCase):
+    def test_articles_are_saved_while_feeds_are_still_arriving(self):
+        titles = ["Cricket final goes to super over", "Parliament passes budget bill",
+                  "Telescope spots distant galaxy merger"]
+        now = ingest.timezone.now()
+        saved_before = []
+
+        def results():
+            for i, title in enumerate(titles):
+                saved_before.append(Article.objects.count())
+                feed = ingest.feedparser.parse(
+                    f"<rss><channel><title>Src {i}</title><item><title>{title}</title>"
+                    f"<link>https://www.thehindu.com/{i}</link>"
+                    f"<pubDate>{now.strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate>"
+                    "</item></channel></rss>".encode())
+                yield ingest.FeedResult(f"https://f{i}.example/rss", feed, 0.0, None, False, None)
+
+        stats = RunStats()
+        articles = ingest.parse_entries(results(), {}, stats)
+        articles = ingest.filter_by_date(articles, now - ingest.timedelta(days=3), stats)
+        articles = ingest.enrich_images(articles, stats, batch_size=1)
+        articles = ingest.cluster(ingest.categorize(articles, stats), clustering.StoryIndex(), stats)
+        stories = ingest.score_stories(articles, stats, batch_size=1)
+        page = StubResponse(b'<meta property="og:image" content="/i.jpg">')
+        with mock.patch.object(ingest.SESSION, "get", return_value=page), \
+                mock.patch.object(ingest, "MIN_SCORE_FOR_VERIFIED", 0):
+            created_ids = ingest.persist(stories, stats, batch_size=1)
+
+        self.assertEqual(saved_before, [0, 1, 2])
+        self.assertEqual(len(created_ids), 3)
+        self.assertEqual((stats["parsed"], stats["stories"], stats["saved"]), (3, 3, 3))
+        self.assertEqual(stats["images_found"], 3)
+        self.assertEqual(len(stats.samples["image_scrape"]), 3)
+        self.assertTrue({"parse", "images", "score", "db_articles"} <= stats.timings.keys())
+
+    def test_run_is_recorded_with_a_json_report(self):
+        Feed.objects.all().delete()
+        Feed.objects.create(url="https://a.example/rss")
+        report = os.path.join(tempfile.mkdtemp(), "report.json")
+
+        with mock.patch.object(ingest.SESSION, "get", return_value=StubResponse(RSS)):
+            call_command("fetch_and_verify_news", report=report, stdout=StringIO())
+
+        run = IngestRun.objects.get()
+        self.assertEqual((run.status, run.feeds_polled), ("ok", 1))
+        with open(report) as f:
+            self.assertEqual(json.load(f), run.report)
+        feed = run.report["feeds"][0]
+        self.assertEqual((feed["url"], feed["bytes"], feed["entries"]), ("https://a.example/rss", len(RSS), 1))
+        self.assertIn("fetch_wait", run.report["stages"])
+
+    def test_a_run_that_changed_nothing_leaves_search_and_pages_alone(self):
+        Feed.objects.all().delete()
+        Feed.objects.create(url="https://a.example/rss")
+
+        with mock.patch.object(ingest.SESSION, "get", return_value=StubResponse(RSS)), \
+                mock.patch.object(ingest, "persist", return_value=[]), \
+                mock.patch.object(ingest.search, "index_articles") as index, \
+                mock.patch.object(ingest.pagecache, "bump_generation") as bump:
+            call_command("fetch_and_verify_news", stdout=StringIO())
+        index.assert_not_called()
+        bump.assert_not_called()
+
+    def test_failed_save_is_raised_and_recorded(self):
+        Feed.objects.all().delete()
+        Feed.objects.create(url="https://a.example/rss")
+
+        def persist(stories, stats, **kwargs):
+            stats["saved"] += 1   # one batch committed before the failure
+            raise RuntimeError("disk full")
+
+        with mock.patch.object(ingest.SESSION, "get", return_value=StubResponse(RSS)), \
+                mock.patch.object(ingest, "persist", side_effect=persist), \
+                mock.patch.object(ingest.search, "index_articles", side_effect=OSError("index")) as index:
+            with self.assertRaises(RuntimeError):   # not masked by the index error
+                call_command("fetch_and_verify_news", stdout=StringIO())
+        index.assert_called_once()
+
+        run = IngestRun.objects.get()
+        self.assertEqual((run.status, run.error), ("failed", "RuntimeError: disk full"))
+
+
+class BenchmarkTests(TestCase):
+    def test_replays_fixtures_offline_at_higher_volume(self):
+        with mock.patch.object(ingest.SESSION, "get", side_effect=AssertionError("network used")):
+            one = bench.run_benchmark(scale=1)
+            two = bench.run_benchmark(scale=2)
+
+        self.assertEqual(two["feeds"], 2 * one["feeds"])
+        self.assertEqual(two["entries"], 2 * one["entries"])
+        # the second copy carries new stories, not duplicates of the first
+        self.assertGreater(two["articles_saved"], 1.5 * one["articles_saved"])
+        self.assertGreater(one["requests"]["page"], 0)
+        self.assertIn("db_articles", one["stages"])
+
+
+class ViewBudgetTests(TestCase):
+    def test_views_stay_within_query_budgets(self):
+        seed_articles(300)
+        results = run_view_benchmark(repeat=1)
+
+        self.assertEqual(over_budget(results), [])
+        self.assertGreater(results["homepage"]["bytes"], 0)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Ties on publication_date must still page by id without gaps or repeats.
+        when = timezone.now()
+        Article.objects.bulk_create([
+            Article(title=f"Story {i}", summary="", category="Health", source_url=f"https://x.test/{i}",
+                    publication_date=when - timezone.timedelta(minutes=i // 3), is_verified=True)
+            for i in range(25)
+        ])
+
+    def test_pages_cover_every_article_once(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = pagination.keyset_page(Article.objects.all(), cursor, page_size=7)
+            seen.extend(a.pk for a in page)
+            if cursor is None:
+                break
+        expected = list(Article.objects.order_by("-publication_date", "-id").values_list("pk", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_fragment_endpoint(self):
+        url = reverse("article_page")
+        first = self.client.get(url, {"category": "health"}).json()
+        self.assertEqual(first["count"], min(25, pagination.PAGE_SIZE))
+
+        _, cursor = pagination.keyset_page(Article.objects.all(), page_size=20)
+        rest = self.client.get(url, {"category": "health", "cursor": cursor}).json()
+        self.assertEqual(rest["count"], 5)
+        self.assertIsNone(rest["next_cursor"])
+        self.assertIn("Story 24", rest["html"])
+
+        self.assertEqual(self.client.get(url, {"cursor": "not-a-cursor"}).status_code, 400)
+
+
+class CategoryCacheTests(TestCase):
+    def setUp(self):
+        categories.invalidate()
+        self.addCleanup(categories.invalidate)
+
+    def test_cached_until_ingest_commits(self):
+        Article.objects.create(title="a", summary="", category="Sports", source_url="https://x.test/a",
+                               is_verified=True)
+        self.assertEqual(categories.category_list(), ["Sports"])
+        with self.assertNumQueries(0):
+            categories.category_list()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ingest.persist_articles([{"title": "b", "source_url": "https://x.test/b",
+                                      "category": "India", "publication_date": timezone.now()}])
+        self.assertEqual(categories.category_list(), ["India", "Sports"])
+
+    def test_a_generation_bump_from_another_process_retires_the_list(self):
+        self.assertEqual(categories.category_list(), [])
+        Article.objects.create(title="a", summary="", category="Sports", source_url="https://x.test/a",
+                               is_verified=True)   # written elsewhere: nothing invalidated here
+        self.assertEqual(categories.category_list(), [])
+        IngestLock.objects.update_or_create(name=locks.INGEST, defaults={"generation": 7})
+        pagecache._generation = None   # this process rereads the generation (GENERATION_CHECK_EVERY)
+        self.assertEqual(categories.category_list(), ["Sports"])
+
+
+class FullTextSearchTests(TestCase):
+    def test_ranked_prefix_search_follows_writes(self):
+        Article.objects.create(title="Monsoon session of parliament", summary="Budget debate <b>today</b>",
+                               source_url="https://x.test/1", is_verified=True)
+        Article.objects.create(title="Cricket final", summary="Rain and the monsoon delay play",
+                               source_url="https://x.test/2", is_verified=True)
+        Article.objects.create(title="Monsoon draft", summary="", source_url="https://x.test/3")
+
+        hits = search.search_articles("monso")
+        self.assertEqual([a.title for a in hits], ["Monsoon session of parliament", "Cricket final"])
+        self.assertIn("<mark>", hits[1].snippet)
+        self.assertEqual([a.title for a in search.search_articles("budget debates")],
+                         ["Monsoon session of parliament"])
+        self.assertIn("&lt;b&gt;", search.search_articles("today")[0].snippet)
+
+        # bulk upserts and deletes keep the index in sync
+        ingest.persist_articles([{"title": "Cricket final", "source_url": "https://x.test/2",
+                                  "summary": "Sunshine all day", "publication_date": timezone.now()}])
+        self.assertEqual(len(search.search_articles("monsoon")), 1)
+        Article.objects.filter(title__startswith="Monsoon session").delete()
+        self.assertEqual(search.search_articles("monsoon"), [])
+        self.assertEqual(search.search_articles("  !! "), [])
+
+
+class InvertedIndexTests(SimpleTestCase):
+    def test_updates_and_round_trip(self):
+        index = invindex.InvertedIndex.empty().updated([
+            (1, "Monsoon session of parliament", "Budget debate today"),
+            (2, "Cricket final", "Rain and the monsoon delay play"),
+            (3, "Election results", "Counting continues"),
+        ])
+        self.assertEqual([pk for pk, _ in index.search("monso", 10)], [1, 2])
+        self.assertEqual([pk for pk, _ in index.search("monsoon budg", 10)], [1])
+        self.assertEqual(index.search("monsoon zebra", 10), [])
+
+        index = index.updated([(2, "Cricket final", "Sunshine all day")], removed=[3])
+        self.assertEqual([pk for pk, _ in index.search("monsoon", 10)], [1])
+        self.assertEqual(index.search("election", 10), [])
+        self.assertNotIn("counting", index.vocab)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.bin")
+            index.save(path)
+            loaded = invindex.InvertedIndex.load(path)
+            self.assertEqual(loaded.vocab, index.vocab)
+            self.assertEqual(loaded.search("sunsh day", 5), index.search("sunsh day", 5))
+
+
+class InvertedIndexSearchTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = override_settings(SEARCH_BACKEND="inverted_index",
+                                     SEARCH_INDEX_FILE=os.path.join(tmp.name, "index.bin"))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        invindex.reset()
+        self.addCleanup(invindex.reset)
+
+    def test_search_follows_ingest_and_api_writes(self):
+        Article.objects.create(title="Monsoon session", summary="Budget <b>debate</b>",
+                               source_url="https://x.test/1", is_verified=True)
+        hits = search.search_articles("budget")   # builds the file on first use
+        self.assertEqual([a.title for a in hits], ["Monsoon session"])
+        self.assertIn("<mark>Budget</mark> &lt;b&gt;debate&lt;/b&gt;", hits[0].snippet)
+        written = os.stat(invindex.index_path()).st_mtime_ns
+        search.index_articles(Article.objects.none())   # nothing changed: the file is not rewritten
+        self.assertEqual(os.stat(invindex.index_path()).st_mtime_ns, written)
+
+        ingest.persist_articles([{"title": "Budget passed", "source_url": "https://x.test/2",
+                                  "publication_date": timezone.now()}])
+        search.index_articles(Article.objects.filter(source_url="https://x.test/2"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("add_article_api"), json.dumps({
+                "title": "Budget reactions", "summary": "", "category": "Business",
+                "source_url": "https://x.test/3", "source_name": "Wire"}), content_type="application/json")
+
+        self.assertEqual({a.title for a in search.search_articles("budget")},
+                         {"Monsoon session", "Budget passed", "Budget reactions"})
+
+        Article.objects.filter(source_url="https://x.test/2").update(is_verified=False)
+        search.index_articles(Article.objects.filter(source_url="https://x.test/2"))
+        self.assertEqual({a.title for a in search.search_articles("budget")},
+                         {"Monsoon session", "Budget reactions"})
+
+    def test_refused_without_file_locks(self):
+        with mock.patch.object(invindex, "SUPPORTED", False):
+            self.assertFalse(search.uses_inverted_index())
+            self.assertEqual([w.id for w in search.check_search_backend()], ["news_feed.W001"])
+            with self.assertRaises(RuntimeError):
+                invindex.build()
+        self.assertEqual(search.check_search_backend(), [])
+
+    def test_a_missing_index_is_built_once_across_processes(self):
+        path = invindex.index_path()
+        writing = invindex._writing
+
+        @contextmanager
+        def built_while_waiting(p):
+            with writing(p):
+                invindex.InvertedIndex.empty().save(p)   # another worker got the lock first
+                yield
+
+        with mock.patch.object(invindex, "_writing", built_while_waiting), \
+                mock.patch.object(invindex, "_build") as build:
+            self.assertFalse(invindex.ensure_index(path))
+        build.assert_not_called()
+
+        out = StringIO()
+        call_command("build_search_index", if_missing=True, stdout=out)
+        self.assertIn("nothing to do", out.getvalue())
+
+    def test_local_view_indexes_its_new_articles_in_one_update(self):
+        local = [{"title": f"Local budget {i}", "summary": "", "category": "Local", "is_verified": True,
+                  "source_url": f"https://x.test/local/{i}", "source_name": "City",
+                  "publication_date": timezone.now()} for i in range(3)]
+        with mock.patch("news_feed.views.get_enhanced_local_news", return_value=local), \
+                mock.patch.object(invindex, "update_index", wraps=invindex.update_index) as update:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.get(reverse("categorized_news", args=["local"]))
+        update.assert_called_once()
+        self.assertEqual(len(search.search_articles("local budget")), 3)
+
+
+class StubWeatherAPI(BaseHTTPRequestHandler):
+    payload = (bench.FIXTURES_DIR / "weather.json").read_bytes()
+    delay = 0.0
+    status = 200
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        time.sleep(self.delay)
+        try:
+            self.send_response(self.status)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(self.payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # the client gave up (timeout tests)
+
+    def log_message(self, *args):
+        pass
+
+
+class WeatherServiceTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        StubWeatherAPI.hits, StubWeatherAPI.delay, StubWeatherAPI.status = 0, 0.0, 200
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubWeatherAPI)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        settings = override_settings(WEATHER_API_URL=f"http://127.0.0.1:{server.server_port}",
+                                     WEATHER_TIMEOUT=0.5)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_concurrent_misses_share_one_call_then_hit_the_cache(self):
+        StubWeatherAPI.delay = 0.2
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(weather.forecast(13.0827, 80.2707)))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(StubWeatherAPI.hits, 1)
+        self.assertEqual({r["city"] for r in results}, {results[0]["city"]})
+        self.assertNotEqual(results[0]["city"], "N/A")
+        self.assertTrue(results[0]["forecast_days"])
+
+        weather.forecast(13.0831, 80.2711)   # rounds to the same cache key
+        self.assertEqual(StubWeatherAPI.hits, 1)
+
+    def test_stale_entries_are_served_while_refreshing(self):
+        weather.forecast(city="Avadi")
+        key = weather._cache_key("forecast", "Avadi")
+        entry = cache.get(key)
+        cache.set(key, {**entry, "expires": 0})
+
+        StubWeatherAPI.delay = 0.3
+        started = time.perf_counter()
+        self.assertNotEqual(weather.forecast(city="Avadi")["city"], "N/A")
+        self.assertLess(time.perf_counter() - started, 0.2)
+        deadline = time.time() + 2
+        while cache.get(key)["expires"] == 0 and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(StubWeatherAPI.hits, 2)
+
+    def test_malformed_answers_count_as_failures_and_bad_days_are_skipped(self):
+        good = json.loads(StubWeatherAPI.payload)
+        partial = {**good, "forecast": {"forecastday": [{"date": "2025-10-18"}, None,
+                                                        *good["forecast"]["forecastday"][:1]]}}
+        with mock.patch.object(StubWeatherAPI, "payload", json.dumps(partial).encode()):
+            self.assertEqual(len(weather.forecast(city="Avadi")["forecast_days"]), 1)
+
+        key = weather._cache_key("forecast", "Avadi")
+        cache.set(key, {**cache.get(key), "expires": 0})
+        with mock.patch.object(StubWeatherAPI, "payload", b'{"location": {"name": "Avadi"}}'):
+            weather.lookup("forecast", "Avadi", days=weather.FORECAST_DAYS)   # refresh in the background
+            deadline = time.time() + 2
+            while cache.get(key)["expires"] == 0 and time.time() < deadline:
+                time.sleep(0.02)
+            # the broken answer was not stored: the old one still stands in
+            self.assertEqual(len(weather.forecast(city="Avadi")["forecast_days"]), 1)
+
+    def test_timeouts_and_errors_are_cached_briefly(self):
+        StubWeatherAPI.delay = 1.0
+        self.assertEqual(weather.forecast(city="Nellore")["city"], "N/A")
+        self.assertEqual(weather.forecast(city="Nellore")["city"], "N/A")
+        self.assertEqual(StubWeatherAPI.hits, 1)
+
+
+class WeatherWidgetTests(TestCase):
+    def test_feed_pages_render_without_the_weather_api(self):
+        cache.clear()
+        payload = bench._response("weather", StubWeatherAPI.payload, headers={"Content-Type": "application/json"})
+        with mock.patch.object(weather.requests, "get", return_value=payload) as get, \
+                mock.patch("news_feed.views.claim_trigger", return_value=False):
+            self.assertEqual(self.client.get(reverse("homepage")).status_code, 200)
+            self.assertEqual(self.client.get(reverse("categorized_news", args=["health"])).status_code, 200)
+            get.assert_not_called()
+
+            response = self.client.get(reverse("weather_widget"), {"lat": "13.08", "lon": "80.27"})
+        self.assertIn("max-age", response["Cache-Control"])
+        self.assertEqual(set(response.json()), {"city", "temperature", "condition", "icon", "forecast_days"})
+        self.assertEqual(get.call_args.kwargs["params"]["q"], "13.08,80.27")
+
+
+class FeedPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Article.objects.create(title="First story", summary="", category="Health", source_url="https://x.test/1",
+                               publication_date=timezone.now(), is_verified=True)
+
+    def test_pages_are_cached_until_the_next_ingest_commit(self):
+        url = reverse("categorized_news", args=["health"])
+        with mock.patch("news_feed.views.claim_trigger", return_value=False):
+            first = self.client.get(url, {"lat": "1", "lon": "2"})
+            self.assertIn("csrftoken", first.cookies)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url).content, first.content)
+
+            ingest.persist_articles([{"title": "Second story", "source_url": "https://x.test/2",
+                                      "category": "Health", "publication_date": timezone.now()}])
+            self.assertNotContains(self.client.get(url), "Second story")
+            pagecache.bump_generation()
+            self.assertContains(self.client.get(url), "Second story")
+            self.assertEqual(IngestLock.objects.get(name=locks.INGEST).generation, 1)
+
+    def test_for_you_is_reshuffled_not_cached(self):
+        url = reverse("categorized_news", args=["for-you"])
+        with mock.patch("news_feed.views.claim_trigger", return_value=False):
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+        self.assertTrue(any("news_feed_article" in q["sql"] for q in queries))
+
+    def test_local_view_bumps_the_generation_once_per_request(self):
+        local = [{"title": f"Local story {i}", "summary": "", "category": "Local", "is_verified": True,
+                  "source_url": f"https://x.test/local/{i}", "publication_date": timezone.now()}
+                 for i in range(3)]
+        with mock.patch("news_feed.views.get_enhanced_local_news", return_value=local):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.get(reverse("categorized_news", args=["local"]))
+        self.assertEqual(IngestLock.objects.get(name=locks.INGEST).generation, 1)
+
+    def test_signed_in_readers_and_excluded_requests_skip_the_cache(self):
+        url = reverse("article_page")
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        self.client.force_login(User.objects.create_user("reader"))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertTrue(any("news_feed_article" in q["sql"] for q in queries))
+
+        rendered = []
+        view = pagecache.cached_feed_page(unless=lambda request: True)(
+            lambda request: rendered.append(request) or HttpResponse("page"))
+        request = RequestFactory().get("/news/category/local/")
+        request.user = AnonymousUser()
+        view(request)
+        view(request)
+        self.assertEqual(len(rendered), 2)
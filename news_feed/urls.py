@@ -10,9 +10,11 @@ urlpatterns = [
     path('', views.landing_page, name='landing_page'),
     path('home/', views.homepage, name='homepage'),
     path("category/<slug:category>/", views.categorized_news, name="categorized_news"),
+    path('feed/page/', views.article_page, name='article_page'),
     path('search/', views.search_results, name='search_results'),
     path('subscribe/', views.subscribe, name='subscribe'),
     path('weather/', views.weather_report, name='weather_report'),
+    path('weather/widget/', views.weather_widget, name='weather_widget'),
     path('report_misinformation/', views.report_misinformation, name='report_misinformation'),
     path('signup/', views.signup_view, name='signup'),
     path('login/', auth_views.LoginView.as_view(template_name='registration/login.html'), name='login'),
@@ -0,0 +1,19 @@
+# news_feed/utils.py
+# Text/URL normalisation shared by the ingest command, clustering and views.
+import re
+from urllib.parse import urlparse
+
+
+def norm_text(s: str) -> str:
+    s = re.sub(r"<[^>]+>", " ", s or "")
+    s = re.sub(r"[^\w\s:/.-]+", " ", s.lower())
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def norm_url(u: str) -> str:
+    try:
+        p = urlparse(u or "")
+        clean = f"{p.scheme}://{p.netloc}{p.path}".rstrip("/")
+        return clean.lower()
+    except Exception:
+        return (u or "").strip().lower()
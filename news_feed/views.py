@@ -1,19 +1,29 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from .models import Article, UserSubscription, Feedback
-from django.db.models import Q
 from datetime import datetime
 import calendar
 import requests
 from urllib.parse import urlparse
 from django.http import JsonResponse
 from .forms import SignUpForm
+from .sources import SOURCES
+from .locks import claim_trigger
+from .pagination import InvalidCursor, keyset_page
+from .search import index_articles_on_commit, search_articles
+from . import weather
+from .pagecache import bump_generation_on_commit, cached_feed_page
+from . import categories as category_cache
+from django.template.loader import render_to_string
+from django.core.management import call_command
+from django.db import connection
 from django.contrib.auth import login
 from django.utils import timezone
-import subprocess
-import sys
 import json
+import threading
+import time
 from datetime import datetime, timedelta
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
 
 
@@ -21,9 +31,10 @@ CATEGORY_LIST = [
     "India", "World", "Local", "Business",
     "Technology", "Sports", "Health",
 ]
-TOP_SOURCES = {'The Hindu','NDTV','Al Jazeera','Times of India'}
+TOP_SOURCES = SOURCES.top_names
 
 CATEGORY_FOR_YOU = "For You"
+FOR_YOU_LABELS = {"for-you", "for_you", "for you"}
 CATEGORY_SHOWCASE = "News Showcase"
 
 RECENT = timezone.now() - timedelta(days=3)
@@ -49,6 +60,9 @@ def add_article_api(request):
                 source_name=data.get('source_name'),
                 is_verified=True # Mark as verified
             )
+            category_cache.invalidate_on_commit()
+            bump_generation_on_commit()
+            index_articles_on_commit([new_article.pk])
             
             # Return a success message
             return JsonResponse({'status': 'success', 'message': f'Article "{new_article.title}" created successfully.'})
@@ -84,43 +98,14 @@ def add_article_api(request):
     # If the request method is not POST, return an error
     return JsonResponse({'status': 'error', 'message': 'Invalid request method.'}, status=405)
 
-def get_weather_context(request):
-    lat = request.GET.get('lat')
-    lon = request.GET.get('lon')
-    api_key = '4723e60bee924b14862145249250509'
-    days = 3
-    
-    location_query = f"{lat},{lon}" if lat and lon else "Nellore"
-    url = f"https://api.weatherapi.com/v1/forecast.json?key={api_key}&q={location_query}&days={days}"
-
-    temperature = condition = icon = city = 'N/A'
-    forecast_days = []
-    
-    try:
-        response = requests.get(url)
-        if response.status_code == 200 and response.text.strip():
-            weather_data = response.json()
-            temperature = weather_data.get('current', {}).get('temp_c', 'N/A')
-            condition = weather_data.get('current', {}).get('condition', {}).get('text', 'N/A')
-            icon = weather_data.get('current', {}).get('condition', {}).get('icon', '')
-            city = weather_data.get('location', {}).get('name', location_query)
-            for day in weather_data.get('forecast', {}).get('forecastday', []):
-                forecast_days.append({
-                    'date': datetime.strptime(day['date'], "%Y-%m-%d").strftime('%a'),
-                    'max_temp': int(day['day']['maxtemp_c']),
-                    'min_temp': int(day['day']['mintemp_c']),
-                    'icon': day['day']['condition']['icon'],
-                })
-    except Exception as e:
-        print("Weather fetch error:", e)
-
-    return {
-        'city': city,
-        'temperature': temperature,
-        'condition': condition,
-        'icon': icon,
-        'forecast_days': forecast_days,
-    }
+@cache_control(max_age=weather.WEATHER_TTL // 2)
+def weather_widget(request):
+    """
+    JSON for the header weather widget, which pages load after rendering, so
+    the feed pages themselves stay the same for every reader.
+    """
+    return JsonResponse(weather.forecast(request.GET.get('lat'), request.GET.get('lon'),
+                                         request.GET.get('city')))
 
 def home_queryset():
      return Article.objects.filter(is_verified=True) \
@@ -128,6 +113,14 @@ def home_queryset():
         .exclude(category__iexact='Local') \
         .order_by("-publication_date")
 
+def feed_queryset(category=None):
+    """Verified articles of one category (home feed when None), in page order."""
+    if not category:
+        return home_queryset()
+    return Article.objects.filter(is_verified=True, category__iexact=category) \
+        .exclude(publication_date__isnull=True) \
+        .order_by("-publication_date")
+
 def user_preferred_categories(user):
     # Replace this with real preference storage when available
     # For now, return None to use the blended fallback for anonymous users
@@ -185,68 +178,45 @@ def signup_view(request):
         form = SignUpForm()
     return render(request, 'registration/signup.html', {'form': form})
 
+FETCH_TRIGGER_INTERVAL = timedelta(minutes=30)  # homepage starts an ingest at most this often
+FETCH_TRIGGER_CHECK_EVERY = 60                  # seconds between this process's lock-row checks
+_next_trigger_check = 0.0
+
+
+def _run_fetch_in_background():
+    try:
+        call_command("fetch_and_verify_news")
+    except Exception as e:
+        print(f"Background news fetch failed: {e}")
+    finally:
+        connection.close()  # this thread's own DB connection
+
+
 def trigger_news_fetch_if_needed():
     """
-    Checks if the news fetch command should be run and triggers it in the background.
-    This prevents running the fetch on every single page load.
+    Starts a background ingest when none has run for FETCH_TRIGGER_INTERVAL.
+    Costs a clock comparison on most requests and one UPDATE on the shared
+    IngestLock row otherwise, so concurrent requests cannot launch parallel
+    runs, and nothing fires while the daemon or cron keeps the news fresh.
     """
-    try:
-        # Use a simple file to store the timestamp of the last run
-        with open("last_fetch_run.tmp", "r") as f:
-            last_run = datetime.fromisoformat(f.read())
-    except (FileNotFoundError, ValueError):
-        last_run = datetime.min
-
-    # --- Run the fetch if more than 30 minutes have passed ---
-    if datetime.now() - last_run > timedelta(minutes=30):
+    global _next_trigger_check
+    now = time.monotonic()
+    if now < _next_trigger_check:
+        return
+    _next_trigger_check = now + FETCH_TRIGGER_CHECK_EVERY
+    if claim_trigger(FETCH_TRIGGER_INTERVAL):
         print("Triggering background news fetch...")
-        # Run the management command in a non-blocking background process
-        subprocess.Popen([sys.executable, "manage.py", "fetch_and_verify_news"])
-        
-        # Update the timestamp file
-        with open("last_fetch_run.tmp", "w") as f:
-            f.write(datetime.now().isoformat())
+        threading.Thread(target=_run_fetch_in_background, daemon=True).start()
 # --- END OF ADDED FUNCTION ---
 
 def homepage(request, category=None):
-    trigger_news_fetch_if_needed()  
-    lat = request.GET.get('lat')
-    lon = request.GET.get('lon')
-    api_key = '4723e60bee924b14862145249250509'
-    days = 3 
+    trigger_news_fetch_if_needed()
+    return _homepage(request, category=category)
+
+@cached_feed_page
+def _homepage(request, category=None):
     show_subscription_popup = False
-    categories = get_category_list() if "get_category_list" in globals() else []
-    if lat and lon:
-        location_query = f"{lat},{lon}"
-    else:
-        # Default location (your choice)
-        location_query = "Avadi"
-    
-    url = f"https://api.weatherapi.com/v1/forecast.json?key={api_key}&q={location_query}&days={days}"
 
-    temperature = condition = icon = 'N/A'
-    forecast_days = []
-    try:
-        response = requests.get(url)
-        # Always check response validity before .json()
-        if response.status_code == 200 and response.text.strip():
-            weather_data = response.json()
-            temperature = weather_data.get('current', {}).get('temp_c', 'N/A')
-            condition = weather_data.get('current', {}).get('condition', {}).get('text', 'N/A')
-            icon = weather_data.get('current', {}).get('condition', {}).get('icon', '')
-            city = weather_data.get('location', {}).get('name', location_query)
-            for day in weather_data.get('forecast', {}).get('forecastday', []):
-                forecast_days.append({
-                    'date': datetime.strptime(day['date'], "%Y-%m-%d").strftime('%a'),  # e.g. "Sat"
-                    'max_temp': int(day['day']['maxtemp_c']),
-                    'min_temp': int(day['day']['mintemp_c']),
-                    'icon': day['day']['condition']['icon'],
-                })
-            else:
-                print("Weather API error:", response.text)
-    except Exception as e:
-        print("Weather fetch error:", e)
-    
     if request.user.is_authenticated:
         try:
             subscription = UserSubscription.objects.get(user=request.user)
@@ -255,35 +225,41 @@ def homepage(request, category=None):
         except UserSubscription.DoesNotExist:
             show_subscription_popup = True
 
-    articles = (Article.objects.filter(is_verified=True)
-                         .exclude(category__iexact="Local")
-                         .order_by("-publication_date")[:120])
-
-    
-    if category:
-        articles = Article.objects.filter(is_verified=True, category__iexact=category).order_by('-publication_date')
-    else:
-        articles = Article.objects.filter(is_verified=True).exclude(category__iexact='Local').order_by('-publication_date')
+    # First page only; the rest is fetched by article_page as the reader scrolls.
+    articles, next_cursor = keyset_page(feed_queryset(category))
 
     context = {
         'articles': articles,
+        'next_cursor': next_cursor,
+        'feed_category': category or '',
         'show_subscription_popup': show_subscription_popup,
-        'categories': get_category_list(),
-        'city': city,
+        'categories': category_cache.category_list(),
         'category': None,
-        'temperature': temperature,
-        'condition': condition,
-        'icon': icon,
-        'forecast_days': forecast_days, 
     }
     return render(request, 'news_feed/homepage.html', context)
 
+@cached_feed_page
+def article_page(request):
+    """
+    Infinite-scroll endpoint: the page of cards after ?cursor= for the home
+    feed, or for ?category= when given, as rendered HTML plus the cursor of
+    the page after it (null on the last page).
+    """
+    try:
+        articles, next_cursor = keyset_page(feed_queryset(request.GET.get('category')),
+                                            request.GET.get('cursor'))
+    except InvalidCursor as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    html = render_to_string('news_feed/partials/article_cards.html', {'articles': articles}, request=request)
+    return JsonResponse({'html': html, 'next_cursor': next_cursor, 'count': len(articles)})
+
 def search_results(request):
-    query = request.GET.get('q')
+    query = request.GET.get('q', '').strip()
     if query:
-        results = Article.objects.filter(Q(title__icontains=query) | Q(summary__icontains=query), is_verified=True).order_by('-publication_date')
+        results = search_articles(query)
     else:
-        results = Article.objects.filter(is_verified=True).order_by('-publication_date')
+        # Nothing to search for: the newest page rather than the whole archive
+        results, _ = keyset_page(Article.objects.filter(is_verified=True).exclude(publication_date__isnull=True))
     
     context = {
         'articles': results,
@@ -299,63 +275,17 @@ def subscribe(request):
         subscription.save()
         return redirect('homepage')
     return redirect('homepage')
-def get_category_list():
-    qs = (Article.objects
-          .filter(is_verified=True)
-          .exclude(category__isnull=True)
-          .exclude(category__exact='')
-          .exclude(category__iexact='General')  
-          .values_list('category', flat=True)
-          .distinct())
-    cats = sorted([c for c in qs if c])  # remove Nones/empties
-    # Optionally prepend a curated set for order
-    have = sorted(c.strip() for c in qs if c and c.strip())
-    have = [c for c in have if c not in {CATEGORY_FOR_YOU, CATEGORY_SHOWCASE,'General'}]
-    preferred = ["India", "World", "Local", "Business",
-                 "Technology", "Entertainment", "Sports", "Science", "Health"]
-    ordered = [c for c in preferred if c in have]
-    rest = [c for c in have if c not in set(ordered)]
-    return ordered + rest
-    #return preferred + rest
-
 def weather_report(request):
     date = request.GET.get('date', datetime.now().strftime('%Y-%m-%d'))
-    api_key = '4723e60bee924b14862145249250509'
-    lat = request.GET.get('lat')
-    lon = request.GET.get('lon')
-    city = None
-    if lat and lon:
-        
-        url = f"https://api.weatherapi.com/v1/current.json?key={api_key}&q={lat},{lon}"
-    else:
-        city = request.GET.get('city', 'London')
-        url = f"https://api.weatherapi.com/v1/current.json?key=4723e60bee924b14862145249250509&q=London&aqi=no"
-    
-    weather_data = {}
-    try:
-        response = requests.get(url)
-        weather_data = response.json()
-        temperature = weather_data.get('current', {}).get('temp_c', 'N/A')
-        condition = weather_data.get('current', {}).get('condition', {}).get('text', 'N/A')
-        icon = weather_data.get('current', {}).get('condition', {}).get('icon', '')
-        city_from_api = weather_data.get('location', {}).get('name')
-        
-        if city_from_api:
-            city = city_from_api
-    except Exception as e:
-        temperature, condition = 'N/A', 'N/A'
+    weather_context = weather.current(request.GET.get('lat'), request.GET.get('lon'),
+                                      request.GET.get('city'), default='London')
 
     day_of_week = calendar.day_name[datetime.strptime(date, '%Y-%m-%d').weekday()]
     
     context = {
-        'weather_data': weather_data,
         'date': date,
         'day_of_week': day_of_week,
-        'city': city,
-        'temperature': temperature,
-        'condition': condition,
-        'icon': icon,
-        'city': city,
+        **weather_context,
     }
     return render(request, 'news_feed/weather_report.html', context)
 import requests
@@ -386,15 +316,8 @@ def get_location_based_news(lat, lon):
         
         # If we can't get city name, try a simpler approach
         if not city:
-            # Use weather API to get city name (you already have this API key)
-            weather_url = f"https://api.weatherapi.com/v1/current.json?key=4723e60bee924b14862145249250509&q={lat},{lon}"
-            try:
-                weather_response = requests.get(weather_url, timeout=5)
-                if weather_response.status_code == 200:
-                    weather_data = weather_response.json()
-                    city = weather_data.get('location', {}).get('name', '')
-            except:
-                city = 'Local'
+            # Use the (cached) weather lookup to get the city name
+            city = weather.current(lat, lon).get('city') or 'Local'
         
         # For demo purposes, create some local news articles based on the detected city
         # In production, you would use a real news API here
@@ -591,23 +514,29 @@ def get_enhanced_local_news(lat, lon, city_name="Avadi"):
         return []
 
 
+def _rendered_per_view(request, category):
+    """Local follows the reader's location and For You is reshuffled on every view: never cached."""
+    label = category.strip().lower()
+    return label == "local" or label in FOR_YOU_LABELS
+
+
+@cached_feed_page(unless=_rendered_per_view)
 def categorized_news(request, category):
-    weather_context = get_weather_context(request)
     base_context = {
-        'categories': get_category_list(),
+        'categories': category_cache.category_list(),
         'show_subscription_popup': False, # You can make this dynamic if needed
     }
-    categories = get_category_list() if "get_category_list" in globals() else []
+    categories = base_context['categories']
     label = (category or "").strip().lower()
-    if label in {"for-you", "for_you", "for you"}:
+    if label in FOR_YOU_LABELS:
         articles = for_you_queryset()
         return render(request, "news_feed/homepage.html", {"articles": articles, "categories": categories, "category": "For you",
-                                                            **base_context, **weather_context,})
+                                                            **base_context,})
 
     if label in {"news-showcase", "news_showcase", "news showcase"}:
         articles = showcase_queryset()
         return render(request, "news_feed/homepage.html", {"articles": articles, "categories": categories, "category": "News Showcase",
-                                                            **base_context, **weather_context,})
+                                                            **base_context,})
     
     if label == "india":
         qs = (Article.objects
@@ -624,8 +553,7 @@ def categorized_news(request, category):
                     {"articles": articles,
                     "categories": categories,
                     "category": "India",
-                    **base_context,
-                    **weather_context,})
+                    **base_context,})
 
     
     # Handle Local category with enhanced location-based news
@@ -641,6 +569,7 @@ def categorized_news(request, category):
         
         # Get enhanced location-based articles
         enhanced_articles = []
+        new_ids = []
         try:
             enhanced_news_data = get_enhanced_local_news(lat, lon, city)
             
@@ -652,9 +581,16 @@ def categorized_news(request, category):
                     defaults=article_data
                 )
                 enhanced_articles.append(article)
+                if created:
+                    new_ids.append(article.pk)
                 
         except Exception as e:
             print(f"Error processing enhanced local news: {e}")
+        if new_ids:
+            # once per request: every bump retires the whole page cache
+            category_cache.invalidate_on_commit()
+            bump_generation_on_commit()
+        index_articles_on_commit(new_ids)   # one index rewrite for the whole batch
         
         # Combine and deduplicate
         all_articles = enhanced_articles + db_articles
@@ -674,7 +610,6 @@ def categorized_news(request, category):
             'categories': categories,
             'category': category,
             **base_context,
-            **weather_context,
            
         }
         return render(request, 'news_feed/homepage.html', context)
@@ -687,8 +622,7 @@ def categorized_news(request, category):
                     {"articles": qs,
                     "categories": categories,
                     "category": "Technology",
-                    **base_context,
-                    **weather_context,})
+                    **base_context,})
 
     if label == "sports":
         qs = (Article.objects.filter(is_verified=True,
@@ -698,8 +632,7 @@ def categorized_news(request, category):
                     {"articles": qs,
                     "categories": categories,
                     "category": "Sports",
-                    **base_context,
-                    **weather_context,})
+                    **base_context,})
 
     if label == "science":
         qs = (Article.objects.filter(is_verified=True,
@@ -709,8 +642,7 @@ def categorized_news(request, category):
                     {"articles": qs,
                     "categories": categories,
                     "category": "Science",
-                    **base_context,
-                    **weather_context,})
+                    **base_context,})
     
     if label == "business":
         # 1. Query for RECENT Business articles (e.g., last 3 days)
@@ -734,8 +666,7 @@ def categorized_news(request, category):
                       {"articles": articles,
                       "categories": categories,
                       "category": "Business",
-                      **base_context,
-                      **weather_context,})
+                      **base_context,})
    
     if label == "world":
         from django.db.models import Count
@@ -749,25 +680,17 @@ def categorized_news(request, category):
         recent_articles = base_qs.filter(publication_date__gte=RECENT)
         articles_list = list(recent_articles if recent_articles.count() >= 30 else base_qs[:120])
         
-        # Remove duplicates by checking title similarity
+        # Remove duplicates: one card per story cluster assigned at ingest time
         unique_articles = []
-        seen_titles = set()
+        seen_stories = set()
         
         for article in articles_list:
-            # Create a normalized version of the title for comparison
-            normalized = ' '.join(article.title.lower().split())
-            
-            # Check if we've seen a very similar title
-            is_duplicate = False
-            for seen_title in seen_titles:
-                # Calculate similarity (you can adjust this threshold)
-                if len(set(normalized.split()) & set(seen_title.split())) >= len(normalized.split()) * 0.7:
-                    is_duplicate = True
-                    break
-            
-            if not is_duplicate:
-                seen_titles.add(normalized)
-                unique_articles.append(article)
+            # Articles saved before clustering existed fall back to their title
+            story = article.story_key or ' '.join(article.title.lower().split())
+            if story in seen_stories:
+                continue
+            seen_stories.add(story)
+            unique_articles.append(article)
                 
             if len(unique_articles) >= 60:  # Limit to 60 unique articles
                 break
@@ -776,20 +699,20 @@ def categorized_news(request, category):
                     {"articles": unique_articles,
                     "categories": categories,
                     "category": "World",
-                    **base_context,
-                    **weather_context,})
+                    **base_context,})
     
 
     
-    # Handle all other categories normally
-    articles = Article.objects.filter(is_verified=True, category__iexact=category).order_by('-publication_date')
+    # Handle all other categories normally, one page at a time
+    articles, next_cursor = keyset_page(feed_queryset(category))
     
     context = {
         'articles': articles,
+        'next_cursor': next_cursor,
+        'feed_category': category,
         'categories': categories,
         'category': category,
         **base_context,
-        **weather_context,
     }
     return render(request, 'news_feed/homepage.html', context)
 
@@ -0,0 +1,168 @@
+# news_feed/weather.py
+"""
+Weather lookups for the header widget (served as JSON by views.weather_widget)
+and the weather report.
+
+Answers come from Django's cache, keyed by endpoint and location (lat/lon
+rounded to LOCATION_PRECISION decimals, or the lower-cased city), so
+readers in the same neighbourhood share one entry. An entry is fresh for
+WEATHER_TTL; after that it is still served, for up to WEATHER_STALE_TTL,
+while a background thread refreshes it (stale-while-revalidate). Once the
+cache is warm no page waits on the weather API.
+
+Only a cold miss calls the API inline, with a strict timeout, and
+concurrent misses for one location share that call. Failures are
+remembered for FAILURE_TTL, so an outage costs each location one timeout a
+minute instead of one per page view. An answer without a "current" object
+counts as a failure too, and malformed forecast days are left out, so an
+API change shows up as missing data rather than an error page.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+WEATHER_TTL = 10 * 60            # seconds an answer counts as fresh
+WEATHER_STALE_TTL = 6 * 60 * 60  # seconds an old answer may stand in while refreshing
+FAILURE_TTL = 60                 # seconds before a failed location is retried
+LOCATION_PRECISION = 2           # decimals of lat/lon in the key, about 1 km
+FORECAST_DAYS = 3
+DEFAULT_CITY = "Avadi"           # for readers who share no location
+
+_inflight = {}                   # cache key -> Future of the API call in progress
+_inflight_lock = threading.Lock()
+
+
+def location_query(lat=None, lon=None, city=None, default=DEFAULT_CITY) -> str:
+    """The API's q parameter: rounded coordinates when both parse, else the city."""
+    try:
+        return f"{round(float(lat), LOCATION_PRECISION)},{round(float(lon), LOCATION_PRECISION)}"
+    except (TypeError, ValueError):
+        return (city or default).strip()
+
+
+def _cache_key(endpoint, query):
+    return f"weather:{endpoint}:{query.lower()}"
+
+
+def _call(endpoint, query, params):
+    try:
+        response = requests.get(
+            f"{settings.WEATHER_API_URL}/{endpoint}.json",
+            params={"key": settings.WEATHER_API_KEY, "q": query, **params},
+            timeout=getattr(settings, "WEATHER_TIMEOUT", 3),
+        )
+        response.raise_for_status()
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"Weather fetch error ({query}): {e}")
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("current"), dict):
+        print(f"Weather fetch error ({query}): unexpected response")
+        return None
+    return data
+
+
+def _store(key, data, previous):
+    """Cache a fresh answer, or on failure keep serving the previous one; returns what to show."""
+    now = time.time()
+    if data is not None:
+        entry = {"data": data, "fetched_at": now, "expires": now + WEATHER_TTL}
+    elif previous and previous["data"] is not None and now - previous["fetched_at"] < WEATHER_STALE_TTL:
+        entry = {**previous, "expires": now + FAILURE_TTL}
+    else:
+        entry = {"data": None, "fetched_at": now, "expires": now + FAILURE_TTL}
+    cache.set(key, entry, WEATHER_STALE_TTL)
+    return entry["data"]
+
+
+def _claim(key):
+    """(future, True) for the caller that must make the call; (running future, False) for the rest."""
+    with _inflight_lock:
+        if key in _inflight:
+            return _inflight[key], False
+        future = _inflight[key] = Future()
+        return future, True
+
+
+def _update(key, future, endpoint, query, params, previous):
+    try:
+        future.set_result(_store(key, _call(endpoint, query, params), previous))
+    except Exception as e:
+        future.set_exception(e)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def lookup(endpoint: str, query: str, **params):
+    """The API's JSON for `endpoint` ("forecast", "current") at `query`, or None if unavailable."""
+    key = _cache_key(endpoint, query)
+    entry = cache.get(key)
+    now = time.time()
+    if entry and now < entry["expires"]:
+        return entry["data"]
+
+    future, owner = _claim(key)
+    if entry and entry["data"] is not None and now - entry["fetched_at"] < WEATHER_STALE_TTL:
+        if owner:
+            threading.Thread(target=_update, args=(key, future, endpoint, query, params, entry),
+                             daemon=True).start()
+        return entry["data"]
+    if owner:
+        _update(key, future, endpoint, query, params, entry)
+    return future.result()
+
+
+def _current_fields(data):
+    current = data.get("current") or {}
+    condition = current.get("condition") or {}
+    return {
+        "temperature": current.get("temp_c", "N/A"),
+        "condition": condition.get("text", "N/A"),
+        "icon": condition.get("icon", ""),
+    }
+
+
+def _forecast_day(day):
+    """One day of the widget's forecast, or None when the API sent it incomplete."""
+    try:
+        totals = day.get("day") or {}
+        return {
+            "date": datetime.strptime(day.get("date", ""), "%Y-%m-%d").strftime("%a"),  # e.g. "Sat"
+            "max_temp": int(totals.get("maxtemp_c")),
+            "min_temp": int(totals.get("mintemp_c")),
+            "icon": (totals.get("condition") or {}).get("icon", ""),
+        }
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def forecast(lat=None, lon=None, city=None, default=DEFAULT_CITY) -> dict:
+    """What the header widget shows: city, temperature, condition, icon, forecast_days."""
+    query = location_query(lat, lon, city, default)
+    data = lookup("forecast", query, days=FORECAST_DAYS)
+    if not data:
+        return {"city": "N/A", "temperature": "N/A", "condition": "N/A", "icon": "N/A", "forecast_days": []}
+    days = (data.get("forecast") or {}).get("forecastday") or []
+    forecast_days = [d for d in map(_forecast_day, days) if d]
+    return {
+        "city": (data.get("location") or {}).get("name", query),
+        **_current_fields(data),
+        "forecast_days": forecast_days,
+    }
+
+
+def current(lat=None, lon=None, city=None, default="London") -> dict:
+    """Template context of the weather report: city, temperature, condition, icon, weather_data."""
+    query = location_query(lat, lon, city, default)
+    data = lookup("current", query, aqi="no") or {}
+    return {
+        "city": (data.get("location") or {}).get("name") or city,
+        **_current_fields(data),
+        "weather_data": data,
+    }
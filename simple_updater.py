@@ -1,31 +1,18 @@
 import os
-import subprocess
-import time
-from datetime import datetime
-
-def update_news():
-    print(f"[{datetime.now()}] Updating news...")
-    try:
-        # Run the Django management command
-        result = subprocess.run(['python', 'manage.py', 'fetch_and_verify_news'], 
-                               capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"[{datetime.now()}] ✅ News updated successfully!")
-        else:
-            print(f"[{datetime.now()}] ❌ Error: {result.stderr}")
-    except Exception as e:
-        print(f"[{datetime.now()}] ❌ Exception: {e}")
+import sys
 
 def main():
     print("🚀 Simple News Updater Started!")
-    
-    # Update immediately
-    update_news()
-    
-    # Then update every 2 hours (7200 seconds)
-    while True:
-        time.sleep(7200)  # 2 hours
-        update_news()
+    # One long-lived process: Django and the HTTP connections stay warm between
+    # runs, feeds are polled when they are due and SIGTERM/Ctrl+C stop it cleanly.
+    # Health: `python manage.py run_ingest_daemon --check`
+    # The daemon runs in this process (no exec), so launchers such as a .bat
+    # file keep the process they started, Ctrl+C reaches it and its exit
+    # code is ours.
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'authentic_news_project.settings')
+    from django.core.management import execute_from_command_line
+    execute_from_command_line([sys.argv[0], 'run_ingest_daemon', *sys.argv[1:]])
 
 if __name__ == "__main__":
     main()